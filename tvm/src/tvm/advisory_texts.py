@@ -5,17 +5,18 @@ from db import get_db
 from models import *
 from authentication import get_current_user
 from typing import List
+from catalog import template_catalog
 
 
+# The read endpoints are served from the template catalog, the write endpoints bump it after every commit
+
 # Get all categories
 @app.get("/categories/", response_model=List[CategoryResponse], tags=["Advisory Texts"])
-def read_categories(
-        db: Session = Depends(get_db)
-):
+def read_categories():
     """
     Get all categories of risks.
     """
-    categories = db.query(Category).all()
+    categories = template_catalog.rows("categories")
     if not categories:
         raise HTTPException(status_code=404, detail="Geen categorieën gevonden.")
     return categories
@@ -24,13 +25,12 @@ def read_categories(
 # Get the category with the given ID
 @app.get("/categories/{category_id}", response_model=CategoryResponse, tags=["Advisory Texts"])
 def read_category(
-        category_id: int,
-        db: Session = Depends(get_db)
+        category_id: int
 ):
     """
     Get a specific category of risk for the given ID.
     """
-    category = db.get(Category, category_id)
+    category = template_catalog.row("categories", category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Categorie niet gevonden.")
     return category
@@ -53,6 +53,7 @@ def create_category(
         new_category = Category(name=category_create.name)
         db.add(new_category)
         db.commit()
+        template_catalog.bump()
         db.refresh(new_category)
         return Response(status_code=201, content=f"Categorie {new_category.name} succesvol gecreëerd.")
     else:
@@ -79,6 +80,7 @@ def update_category(
 
         db.query(AdvisoryText).filter(AdvisoryText.category == old_category_name).update({"category": category.name})
         db.commit()
+        template_catalog.bump()
         db.refresh(category)
         return Response(status_code=200, content=f"Categorie {category.name} succesvol geüpdatet.")
     else:
@@ -103,6 +105,7 @@ def delete_category(
         db.query(AdvisoryText).filter(AdvisoryText.category == category.name).delete()
         db.delete(category)
         db.commit()
+        template_catalog.bump()
         return Response(status_code=204)
     else:
         raise HTTPException(status_code=403, detail="U bent niet gerechtigd om een categorie te verwijderen.")
@@ -110,13 +113,11 @@ def delete_category(
 
 # Get all subcategories
 @app.get("/subcategories/", response_model=List[SubCategoryResponse], tags=["Advisory Texts"])
-def read_subcategories(
-        db: Session = Depends(get_db)
-):
+def read_subcategories():
     """
     Gets all subcategories of risk willingness.
     """
-    subcategories = db.query(SubCategory).all()
+    subcategories = template_catalog.rows("subcategories")
     if not subcategories:
         raise HTTPException(status_code=404, detail="Geen subcategorieën gevonden.")
     return subcategories
@@ -125,17 +126,17 @@ def read_subcategories(
 # Get all subcategories by category ID
 @app.get("/categories/{category_id}/subcategories", response_model=List[SubCategoryResponse], tags=["Advisory Texts"])
 def read_subcategories_by_category(
-        category_id: int,
-        db: Session = Depends(get_db)
+        category_id: int
 ):
     """
     Gets all subcategories for a specific category ID.
     """
-    category = db.get(Category, category_id)
+    category = template_catalog.row("categories", category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Categorie niet gevonden.")
 
-    subcategories = db.query(SubCategory).filter(SubCategory.category_id == category_id).all()
+    subcategories = [subcategory for subcategory in template_catalog.rows("subcategories")
+                     if subcategory["category_id"] == category_id]
     if not subcategories:
         raise HTTPException(status_code=404, detail="Geen subcategorieën voor deze categorie gevonden.")
 
@@ -145,13 +146,12 @@ def read_subcategories_by_category(
 # Get the subcategory with the given ID
 @app.get("/subcategories/{subcategory_id}", response_model=SubCategoryResponse, tags=["Advisory Texts"])
 def read_subcategory(
-        subcategory_id: int,
-        db: Session = Depends(get_db)
+        subcategory_id: int
 ):
     """
     Gets a specific subcategory of risk willingness corresponding to the given ID.
     """
-    subcategory = db.query(SubCategory).filter(SubCategory.id == subcategory_id).first()
+    subcategory = template_catalog.row("subcategories", subcategory_id)
     if not subcategory:
         raise HTTPException(status_code=404, detail="Subcategorie niet gevonden.")
     return subcategory
@@ -159,13 +159,11 @@ def read_subcategory(
 
 # Gets all advice texts
 @app.get("/advisorytexts/", response_model=List[AdvisoryTextResponse], tags=["Advisory Texts"])
-def read_texts(
-        db: Session = Depends(get_db)
-):
+def read_texts():
     """
     Gets all advisory texts templates.
     """
-    advisorytexts = db.query(AdvisoryText).all()
+    advisorytexts = template_catalog.rows("advisory_texts")
     if not advisorytexts:
         raise HTTPException(status_code=404, detail="Geen adviesteksten gevonden.")
     return advisorytexts
@@ -174,13 +172,12 @@ def read_texts(
 # Gets the advice text with the given ID
 @app.get("/advisorytexts/id={text_id}", response_model=AdvisoryTextResponse, tags=["Advisory Texts"])
 def read_text(
-        text_id: int,
-        db: Session = Depends(get_db)
+        text_id: int
 ):
     """
     Gets a specific advisory text template for a given ID.
     """
-    advisorytext = db.query(AdvisoryText).filter(AdvisoryText.id == text_id).first()
+    advisorytext = template_catalog.row("advisory_texts", text_id)
     if not advisorytext:
         raise HTTPException(status_code=404, detail="Adviestekst niet gevonden.")
     return advisorytext
@@ -213,6 +210,7 @@ def create_text(
         db.add(new_advice)
         db.add(new_subcategory)
         db.commit()
+        template_catalog.bump()
         db.refresh(new_advice)
         db.refresh(new_subcategory)
         return Response(status_code=201, content=f"Adviestekst {new_advice.text} succesvol gecreëerd.")
@@ -237,6 +235,7 @@ def update_text(
             raise HTTPException(status_code=404, detail="Adviestekst niet gevonden.")
         advisorytext.text = advisory_text_update.text
         db.commit()
+        template_catalog.bump()
         db.refresh(advisorytext)
         return Response(status_code=200, content=f"Adviestekst {advisorytext.text} is succesvol geüpdatet.")
     else:
@@ -268,6 +267,7 @@ def delete_text(
 
         db.delete(advisorytext)
         db.commit()
+        template_catalog.bump()
 
         return Response(status_code=204)
     else:
@@ -277,24 +277,20 @@ def delete_text(
 # Get advisory text by subcategory ID
 @app.get("/advisorytexts/subcategory/{subcategory_id}", response_model=AdvisoryTextResponse, tags=["Advisory Texts"])
 def read_text_by_subcategory(
-        subcategory_id: int,
-        db: Session = Depends(get_db)
+        subcategory_id: int
 ):
     """
     Gets the advisory text for a specific subcategory ID.
     """
-    subcategory = db.query(SubCategory).filter(SubCategory.id == subcategory_id).first()
+    subcategory = template_catalog.row("subcategories", subcategory_id)
     if not subcategory:
         raise HTTPException(status_code=404, detail="Subcategorie niet gevonden.")
 
-    category = db.get(Category, subcategory.category_id)
+    category = template_catalog.row("categories", subcategory["category_id"])
     if not category:
         raise HTTPException(status_code=404, detail="Categorie niet gevonden.")
 
-    advisorytext = db.query(AdvisoryText).filter(
-        AdvisoryText.category == category.name,
-        AdvisoryText.sub_category == subcategory.name
-    ).first()
+    advisorytext = template_catalog.text_row(category["name"], subcategory["name"])
 
     if not advisorytext:
         raise HTTPException(status_code=404, detail="Geen adviestekst gevonden voor deze subcategorie.")
@@ -1,14 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from typing import Optional
 from datetime import datetime, timedelta, timezone
 import os
 import secrets
-from models import User, RefreshToken, RefreshTokenRequest, UserResponse, UserUpdateRequest
-from db import get_db
+from models import Conversation, User, RefreshToken, RefreshTokenRequest, UserResponse, UserUpdateRequest
+from db import delete_conversations, get_db, get_async_db
 
 SECRET_KEY = os.environ.get("SECRET")
 ALGORITHM = "HS256"
@@ -27,10 +30,10 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    # Look for user in DB and verify password
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    # Look for user in DB and verify password, hashing is slow so it runs outside the event loop
+    user = (await db.execute(select(User).filter(User.username == username))).scalars().first()
+    if not user or not await run_in_threadpool(verify_password, password, user.hashed_password):
         return False
     return user
 
@@ -42,28 +45,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def cleanup_expired_tokens(db: Session):
+async def cleanup_expired_tokens(db: AsyncSession):
     # Remove all expired refresh tokens from database
     current_time = datetime.now(timezone.utc)
-    deleted_count = db.query(RefreshToken).filter(
+    result = await db.execute(delete(RefreshToken).filter(
         RefreshToken.expires_at < current_time
-    ).delete()
-    db.commit()
-    return deleted_count
+    ))
+    await db.commit()
+    return result.rowcount
 
 
-def create_refresh_token(db: Session, user_id: int):
+async def create_refresh_token(db: AsyncSession, user_id: int):
     # Clean up expired tokens globally
-    cleanup_expired_tokens(db)
+    await cleanup_expired_tokens(db)
 
     # Generate a secure random token
     token = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
 
     # Delete old refresh tokens for this user (complete removal)
-    db.query(RefreshToken).filter(
+    await db.execute(delete(RefreshToken).filter(
         RefreshToken.user_id == user_id
-    ).delete()
+    ))
 
     # Create new refresh token
     refresh_token = RefreshToken(
@@ -72,46 +75,46 @@ def create_refresh_token(db: Session, user_id: int):
         expires_at=expires_at
     )
     db.add(refresh_token)
-    db.commit()
+    await db.commit()
 
     return token
 
 
-def verify_refresh_token(db: Session, token: str):
+async def verify_refresh_token(db: AsyncSession, token: str):
     # Clean up expired tokens before verification
-    cleanup_expired_tokens(db)
+    await cleanup_expired_tokens(db)
 
     # Look for token in DB
-    refresh_token = db.query(RefreshToken).filter(
+    refresh_token = (await db.execute(select(RefreshToken).filter(
         RefreshToken.token == token,
         RefreshToken.expires_at > datetime.now(timezone.utc)
-    ).first()
+    ))).scalars().first()
 
     # Token not found in DB
     if not refresh_token:
         return None
 
     # Search for user and return it based on refresh token
-    user = db.query(User).filter(User.id == refresh_token.user_id).first()
+    user = (await db.execute(select(User).filter(User.id == refresh_token.user_id))).scalars().first()
     return user
 
 
-def revoke_refresh_token(db: Session, token: str):
+async def revoke_refresh_token(db: AsyncSession, token: str):
     # Delete the refresh token completely
-    db.query(RefreshToken).filter(RefreshToken.token == token).delete()
-    db.commit()
+    await db.execute(delete(RefreshToken).filter(RefreshToken.token == token))
+    await db.commit()
 
 
-def revoke_all_user_tokens(db: Session, user_id: int):
+async def revoke_all_user_tokens(db: AsyncSession, user_id: int):
     # Delete all tokens of a specific user
-    deleted_count = db.query(RefreshToken).filter(
+    result = await db.execute(delete(RefreshToken).filter(
         RefreshToken.user_id == user_id
-    ).delete()
-    db.commit()
-    return deleted_count
+    ))
+    await db.commit()
+    return result.rowcount
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Kon credentialen niet verifiëren",
@@ -127,7 +130,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = (await db.execute(select(User).filter(User.username == username))).scalars().first()
     if user is None:
         raise credentials_exception
     return user
@@ -158,17 +161,17 @@ from main import app
 @app.post("/token", tags=["Authentication"])
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with username and password to get access token and refresh token
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrecte gebruikersnaam of wachtwoord")
 
     access_token = create_access_token(data={"sub": user.username})
-    refresh_token = create_refresh_token(db, user.id)
+    refresh_token = await create_refresh_token(db, user.id)
 
     return {
         "access_token": access_token,
@@ -181,12 +184,12 @@ async def login(
 @app.post("/token/refresh", tags=["Authentication"])
 async def refresh_access_token(
         request: RefreshTokenRequest,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh access token using refresh token
     """
-    user = verify_refresh_token(db, request.refresh_token)
+    user = await verify_refresh_token(db, request.refresh_token)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -197,7 +200,7 @@ async def refresh_access_token(
     access_token = create_access_token(data={"sub": user.username})
 
     # Create a new refresh token for token rotation
-    new_refresh_token = create_refresh_token(db, user.id)
+    new_refresh_token = await create_refresh_token(db, user.id)
 
     return {
         "access_token": access_token,
@@ -210,24 +213,24 @@ async def refresh_access_token(
 @app.post("/token/revoke", tags=["Authentication"])
 async def revoke_token(
         request: RefreshTokenRequest,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Revoke refresh token
     """
-    revoke_refresh_token(db, request.refresh_token)
+    await revoke_refresh_token(db, request.refresh_token)
     return {"message": "Token is succesvol ingetrokken"}
 
 
 @app.post("/logout", tags=["Authentication"])
 async def logout(
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Logout and revoke all refresh tokens
     """
-    deleted_count = revoke_all_user_tokens(db, current_user.id)
+    deleted_count = await revoke_all_user_tokens(db, current_user.id)
     return {"message": f"Succesvol uitgelogd. {deleted_count} aantal tokens weggehaald."}
 
 
@@ -291,50 +294,52 @@ def list_users(
 
 
 @app.put("/users/{user_id}", tags=["Authentication"], response_model=UserResponse)
-def update_user(
+async def update_user(
         user_id: int,
         user_update: UserUpdateRequest,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         admin: User = Depends(get_current_admin_user)
 ):
     """
     Update user by ID
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).filter(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="Gebruiker niet gevonden")
 
     # Check if username is being changed and if it's already taken
     if user_update.username and user_update.username != user.username:
-        existing_user = db.query(User).filter(User.username == user_update.username).first()
+        existing_user = (await db.execute(
+            select(User).filter(User.username == user_update.username)
+        )).scalars().first()
         if existing_user:
             raise HTTPException(status_code=400, detail="Gebruikersnaam is al in gebruik")
         user.username = user_update.username
 
     # Update password if provided
     if user_update.password:
-        user.hashed_password = get_password_hash(user_update.password)
-        revoke_all_user_tokens(db, user.id)
+        user.hashed_password = await run_in_threadpool(get_password_hash, user_update.password)
+        await revoke_all_user_tokens(db, user.id)
 
     # Update role if provided
     if user_update.role:
         user.role = user_update.role
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @app.delete("/users/{user_id}", tags=["Authentication"])
-def delete_user(
+async def delete_user(
         user_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         admin: User = Depends(get_current_admin_user)
 ):
     """
     Delete user by ID
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).filter(User.id == user_id))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="Gebruiker niet gevonden")
 
@@ -343,10 +348,12 @@ def delete_user(
         raise HTTPException(status_code=400, detail="Het is niet mogelijk om je eigen account te verwijderen")
 
     # Revoke all refresh tokens before deletion
-    revoke_all_user_tokens(db, user.id)
+    await revoke_all_user_tokens(db, user.id)
 
-    # Delete the user
-    db.delete(user)
-    db.commit()
+    # Delete the conversations with their messages and then the user, without loading any of them
+    username = user.username
+    await delete_conversations(db, Conversation.user_id == user.id)
+    await db.execute(delete(User).where(User.id == user.id), execution_options={"synchronize_session": False})
+    await db.commit()
 
-    return {"message": f"Gebruiker '{user.username}' succesvol verwijderd!"}
+    return {"message": f"Gebruiker '{username}' succesvol verwijderd!"}
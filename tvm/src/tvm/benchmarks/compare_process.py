@@ -0,0 +1,64 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+from crewai import Process
+from crew import Tvm
+from filter_input_util import input_filter
+
+SAMPLE_INPUT = Path(__file__).parent / "sample_input.txt"
+
+
+def run_process(process: str, input_text: str, runs: int) -> dict:
+    """
+    Runs the Tvm pipeline a number of times with the given process and collects latency and token usage
+    """
+    durations = []
+    total_tokens = []
+    prompt_tokens = []
+    completion_tokens = []
+    requests = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = Tvm(process=process).kickoff(inputs={"input": input_filter.filter_input(input_text)})
+        durations.append(time.perf_counter() - start)
+        total_tokens.append(result.token_usage.total_tokens)
+        prompt_tokens.append(result.token_usage.prompt_tokens)
+        completion_tokens.append(result.token_usage.completion_tokens)
+        requests.append(result.token_usage.successful_requests)
+
+    return {
+        "process": process,
+        "mean_seconds": statistics.mean(durations),
+        "max_seconds": max(durations),
+        "total_tokens": statistics.mean(total_tokens),
+        "prompt_tokens": statistics.mean(prompt_tokens),
+        "completion_tokens": statistics.mean(completion_tokens),
+        "llm_requests": statistics.mean(requests),
+    }
+
+
+def print_report(results: list):
+    print(f"{'process':<14}{'mean s':>10}{'max s':>10}{'tokens':>10}{'prompt':>10}{'completion':>12}{'requests':>10}")
+    for result in results:
+        print(f"{result['process']:<14}{result['mean_seconds']:>10.1f}{result['max_seconds']:>10.1f}"
+              f"{result['total_tokens']:>10.0f}{result['prompt_tokens']:>10.0f}"
+              f"{result['completion_tokens']:>12.0f}{result['llm_requests']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare latency and token usage of the crew processes.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs per process")
+    parser.add_argument("--input", type=Path, default=SAMPLE_INPUT, help="File with the advisory text to use")
+    args = parser.parse_args()
+
+    input_text = args.input.read_text(encoding="utf-8")
+    print_report([
+        run_process(process.value, input_text, args.runs)
+        for process in (Process.hierarchical, Process.sequential)
+    ])
@@ -0,0 +1,110 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+from threading import Lock
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+import litellm
+from crew import Tvm
+from filter_input_util import input_filter
+
+SAMPLE_INPUT = Path(__file__).parent / "sample_input.txt"
+PROFILES = ("reasoning", "routed")
+
+
+class ModelUsage:
+    """
+    Counts the tokens of every successful LLM call per model, as the crew only reports them per agent
+    """
+
+    def __init__(self):
+        self.tokens = {}
+        self.lock = Lock()
+
+    def reset(self):
+        with self.lock:
+            self.tokens = {}
+
+    def on_success(self, kwargs, response, start_time, end_time):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        with self.lock:
+            prompt, completion = self.tokens.get(kwargs.get("model"), (0, 0))
+            self.tokens[kwargs.get("model")] = (prompt + usage.prompt_tokens, completion + usage.completion_tokens)
+
+
+def parse_prices(prices: list) -> dict:
+    """
+    MODEL=INPUT,OUTPUT in dollars per million tokens, the model as litellm reports it (without the provider)
+    """
+    parsed = {}
+    for price in prices:
+        model, costs = price.rsplit("=", 1)
+        prompt_price, completion_price = (float(cost) for cost in costs.split(","))
+        parsed[model] = (prompt_price, completion_price)
+    return parsed
+
+
+def run_profile(profile: str, process: str, input_text: str, runs: int, usage: ModelUsage, prices: dict) -> dict:
+    """
+    Runs the Tvm pipeline a number of times with the given LLM profile and collects latency and token usage per model
+    """
+    durations = []
+    tokens = {}
+
+    for _ in range(runs):
+        usage.reset()
+        start = time.perf_counter()
+        Tvm(process=process, llm_profile=profile).kickoff(inputs={"input": input_filter.filter_input(input_text)})
+        durations.append(time.perf_counter() - start)
+        for model, (prompt, completion) in usage.tokens.items():
+            total_prompt, total_completion = tokens.get(model, (0, 0))
+            tokens[model] = (total_prompt + prompt, total_completion + completion)
+
+    tokens = {model: (prompt / runs, completion / runs) for model, (prompt, completion) in tokens.items()}
+    cost = None
+    if all(model in prices for model in tokens):
+        cost = sum((prompt * prices[model][0] + completion * prices[model][1]) / 1_000_000
+                   for model, (prompt, completion) in tokens.items())
+
+    return {
+        "profile": profile,
+        "mean_seconds": statistics.mean(durations),
+        "max_seconds": max(durations),
+        "tokens": tokens,
+        "cost": cost,
+    }
+
+
+def print_report(results: list):
+    print(f"{'profile':<12}{'mean s':>10}{'max s':>10}{'cost $':>10}  {'model':<28}{'prompt':>10}{'completion':>12}")
+    for result in results:
+        cost = f"{result['cost']:>10.4f}" if result["cost"] is not None else f"{'-':>10}"
+        line = f"{result['profile']:<12}{result['mean_seconds']:>10.1f}{result['max_seconds']:>10.1f}{cost}"
+        for model, (prompt, completion) in sorted(result["tokens"].items()):
+            print(f"{line}  {model:<28}{prompt:>10.0f}{completion:>12.0f}")
+            line = " " * 42
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare latency and token cost of the LLM routing profiles.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs per profile")
+    parser.add_argument("--process", choices=["hierarchical", "sequential"], default="sequential",
+                        help="Crew process for the runs")
+    parser.add_argument("--input", type=Path, default=SAMPLE_INPUT, help="File with the advisory text to use")
+    parser.add_argument("--price", action="append", default=[], metavar="MODEL=INPUT,OUTPUT",
+                        help="Dollars per million prompt and completion tokens of a model, repeat for every model")
+    args = parser.parse_args()
+
+    model_usage = ModelUsage()
+    litellm.success_callback.append(model_usage.on_success)
+
+    input_text = args.input.read_text(encoding="utf-8")
+    print_report([
+        run_profile(profile, args.process, input_text, args.runs, model_usage, parse_prices(args.price))
+        for profile in PROFILES
+    ])
@@ -0,0 +1,58 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+import litellm
+from filter import filter_service
+from benchmarks.compare_routing import ModelUsage
+from benchmarks.eval_relevance import EVAL_SET, labelled_queries
+from benchmarks.load_test import percentile
+
+
+def run_mode(mode: str, queries: list, usage: ModelUsage) -> dict:
+    """
+    Screens every query with the LLM in the given mode and collects accuracy, latency and token usage
+    """
+    screen = filter_service.screen_directly if mode == "direct" else filter_service.screen_with_crew
+    usage.reset()
+    durations = []
+    correct = 0
+    for query, label in queries:
+        start = time.perf_counter()
+        correct += screen(query) == label
+        durations.append(time.perf_counter() - start)
+
+    prompt_tokens = sum(prompt for prompt, _ in usage.tokens.values())
+    completion_tokens = sum(completion for _, completion in usage.tokens.values())
+    return {
+        "mode": mode,
+        "accuracy": correct / len(queries),
+        "mean_seconds": statistics.mean(durations),
+        "p95_seconds": percentile(durations, 95),
+        "prompt_tokens": prompt_tokens / len(queries),
+        "completion_tokens": completion_tokens / len(queries),
+    }
+
+
+def print_report(results: list):
+    print(f"{'mode':<10}{'accuracy':>10}{'mean s':>10}{'p95 s':>10}{'prompt':>10}{'completion':>12}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['accuracy']:>10.1%}{result['mean_seconds']:>10.2f}"
+              f"{result['p95_seconds']:>10.2f}{result['prompt_tokens']:>10.0f}{result['completion_tokens']:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the direct and the crew based LLM screening.")
+    parser.add_argument("--eval-set", type=Path, default=EVAL_SET, help="YAML file with relevant and irrelevant queries")
+    args = parser.parse_args()
+
+    model_usage = ModelUsage()
+    litellm.success_callback.append(model_usage.on_success)
+
+    labelled = labelled_queries(args.eval_set)
+    print(f"{len(labelled)} queries, tokens are the mean per query")
+    print_report([run_mode(mode, labelled, model_usage) for mode in ("crew", "direct")])
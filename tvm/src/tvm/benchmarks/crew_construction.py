@@ -0,0 +1,66 @@
+import argparse
+import statistics
+import time
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+from crew import Tvm, TvmFactory
+
+
+def per_request_construction():
+    """
+    What every request used to do: parse the configuration and build the LLMs, agents, tasks and crews
+    """
+    tvm = Tvm()
+    tvm.selection_crew()
+    tvm.writing_crew()
+
+
+def crew_copy_construction(tvm: Tvm):
+    """
+    What every request did with prebuilt crews before the crew sets: copy the prototype crews with Crew.copy(),
+    which also copies every agent and the manager
+    """
+    tvm.prototype_crew(tvm.selection_crew).copy()
+    tvm.prototype_crew(tvm.writing_crew).copy()
+
+
+def factory_construction(factory: TvmFactory):
+    """
+    What every request does now: take the prebuilt Tvm and an idle crew set, and copy only the tasks
+    """
+    tvm = factory.get()
+    crew_set = tvm.checkout_crew_set()
+    tvm.fresh_crew(tvm.selection_crew, crew_set)
+    tvm.fresh_crew(tvm.writing_crew, crew_set)
+    tvm.checkin_crew_sets([crew_set])
+
+
+def measure(construct, iterations: int) -> list:
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        construct()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def print_report(name: str, durations: list):
+    durations = sorted(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f"{name:<28}{statistics.mean(durations):>10.2f}{statistics.median(durations):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the per-request crew construction overhead.")
+    parser.add_argument("--iterations", type=int, default=50, help="Number of constructions to measure")
+    args = parser.parse_args()
+
+    factory = TvmFactory()
+    factory.get().warm_up()
+
+    print(f"{'construction (ms)':<28}{'mean':>10}{'median':>10}{'p95':>10}")
+    print_report("Tvm() per request", measure(per_request_construction, args.iterations))
+    print_report("Crew.copy() per request", measure(lambda: crew_copy_construction(factory.get()), args.iterations))
+    print_report("TvmFactory + crew set", measure(lambda: factory_construction(factory), args.iterations))
@@ -0,0 +1,123 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+import httpx
+from benchmarks.load_test import benchmark_user, percentile, start_app
+
+# Endpoints that only use the database, every request also looks up the user of its token
+ENDPOINTS = {
+    "conversations": ("GET", "/conversations"),
+    "messages": ("GET", "/conversations/{conversation_id}/messages"),
+    "create": ("POST", "/conversations"),
+}
+
+
+def seed_conversations(user_id: int, conversations: int, messages: int) -> int:
+    """
+    Give the benchmark user at least the given number of conversations, returns the id of one with messages
+    """
+    from db import SessionLocal
+    from models import Conversation, Message
+
+    db = SessionLocal()
+    try:
+        existing = db.query(Conversation).filter(Conversation.user_id == user_id).count()
+        for _ in range(conversations - existing):
+            conversation = Conversation(user_id=user_id, created_at=datetime.now(timezone.utc))
+            db.add(conversation)
+            db.flush()
+            db.add_all([
+                Message(conversation_id=conversation.id, content=f"Bericht {number}", is_user_message=number % 2 == 0,
+                        created_at=datetime.now(timezone.utc))
+                for number in range(messages)
+            ])
+        db.commit()
+        return db.query(Conversation.id).filter(Conversation.user_id == user_id).order_by(Conversation.id).first()[0]
+    finally:
+        db.close()
+
+
+def run_level(base_url: str, token: str, method: str, path: str, concurrency: int, requests: int) -> dict:
+    """
+    Send the requests with the given number of concurrent clients and collect the latencies
+    """
+    def send(_) -> tuple:
+        start = time.perf_counter()
+        try:
+            with httpx.Client(timeout=None) as client:
+                response = client.request(method, f"{base_url}{path}", headers={"Authorization": f"Bearer {token}"})
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, ok in results if ok]
+    return {
+        "concurrency": concurrency,
+        "errors": sum(not ok for _, ok in results),
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50) if latencies else None,
+        "p95": percentile(latencies, 95) if latencies else None,
+    }
+
+
+def print_report(results: dict, baseline: dict):
+    header = f"{'endpoint':<16}{'concurrency':>12}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+    print(header + (f"{'before':>10}{'change':>10}" if baseline else ""))
+    for endpoint, levels in results.items():
+        for level in levels:
+            latencies = "".join(f"{level[key] * 1000:>10.1f}" if level[key] is not None else f"{'-':>10}"
+                                for key in ("p50", "p95"))
+            line = f"{endpoint:<16}{level['concurrency']:>12}{level['errors']:>8}{level['throughput']:>10.1f}{latencies}"
+            before = next((old for old in baseline.get(endpoint, []) if old["concurrency"] == level["concurrency"]), None)
+            if before:
+                line += f"{before['throughput']:>10.1f}{level['throughput'] / before['throughput'] - 1:>+10.0%}"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the request throughput of the database endpoints.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients per level")
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests per level and endpoint")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=["conversations", "messages"],
+                        help="Endpoints to measure")
+    parser.add_argument("--conversations", type=int, default=50, help="Conversations of the benchmark user")
+    parser.add_argument("--messages", type=int, default=20, help="Messages per seeded conversation")
+    parser.add_argument("--base-url", help="URL of an already running app, the app is started in-process without it")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    parser.add_argument("--compare", type=Path, help="Results of an earlier run (--json) to compare with")
+    args = parser.parse_args()
+
+    from authentication import create_access_token
+
+    user = benchmark_user()
+    conversation_id = seed_conversations(user.id, args.conversations, args.messages)
+    access_token = create_access_token(data={"sub": user.username})
+    # In-process the load generator shares the GIL with the app, a separate app gives more realistic numbers
+    server, base_url = start_app(override_authentication=False) if not args.base_url else (None, args.base_url)
+
+    results = {}
+    for name in args.endpoints:
+        method, path = ENDPOINTS[name]
+        path = path.format(conversation_id=conversation_id)
+        results[name] = [run_level(base_url, access_token, method, path, concurrency, args.requests)
+                         for concurrency in args.concurrency]
+
+    if server:
+        server.should_exit = True
+
+    print_report(results, json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else {})
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
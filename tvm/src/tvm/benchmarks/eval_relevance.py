@@ -0,0 +1,77 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+from filter import filter_service
+from relevance_classifier import RelevanceClassifier, relevance_classifier
+from benchmarks.load_test import percentile
+
+EVAL_SET = Path(__file__).parent / "relevance_eval.yaml"
+MARGINS = (0.0, 0.02, 0.05, 0.08, 0.1, 0.15)
+
+
+def labelled_queries(path: Path) -> list:
+    examples = RelevanceClassifier.load_examples(path)
+    return [(query, True) for query in examples["relevant"]] + [(query, False) for query in examples["irrelevant"]]
+
+
+def timed(screen, queries: list) -> tuple:
+    """
+    The answer and the seconds it took for every query
+    """
+    answers = []
+    durations = []
+    for query, _ in queries:
+        start = time.perf_counter()
+        answers.append(screen(query))
+        durations.append(time.perf_counter() - start)
+    return answers, durations
+
+
+def accuracy(answers: list, queries: list) -> float:
+    return sum(answer == label for answer, (_, label) in zip(answers, queries)) / len(queries)
+
+
+def print_latency(name: str, durations: list):
+    print(f"{name:<24}{statistics.mean(durations) * 1000:>10.1f}{percentile(durations, 95) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the local relevance classifier with the LLM screener.")
+    parser.add_argument("--eval-set", type=Path, default=EVAL_SET, help="YAML file with relevant and irrelevant queries")
+    parser.add_argument("--skip-llm", action="store_true", help="Only evaluate the local classifier")
+    args = parser.parse_args()
+
+    queries = labelled_queries(args.eval_set)
+    # Load the model and embed the examples before timing
+    relevance_classifier.example_embeddings()
+    scores, classifier_durations = timed(relevance_classifier.score, queries)
+    llm_answers, llm_durations = ([], []) if args.skip_llm else timed(filter_service.screen_with_llm, queries)
+
+    print(f"{len(queries)} queries, margin {relevance_classifier.margin} configured")
+    print()
+    print(f"{'screener':<24}{'mean ms':>10}{'p95 ms':>10}")
+    print_latency("classifier", classifier_durations)
+    if llm_answers:
+        print_latency("llm", llm_durations)
+        print(f"\nLLM accuracy {accuracy(llm_answers, queries):.1%}")
+
+    print()
+    print(f"{'margin':>8}{'local':>10}{'local acc':>12}" + ("" if args.skip_llm else f"{'with llm acc':>14}"))
+    for margin in sorted({*MARGINS, relevance_classifier.margin}):
+        local = [(score > 0, label, index) for index, (score, (_, label)) in enumerate(zip(scores, queries))
+                 if abs(score) >= margin]
+        local_accuracy = sum(answer == label for answer, label, _ in local) / len(local) if local else None
+        line = f"{margin:>8.2f}{len(local) / len(queries):>10.1%}"
+        line += f"{local_accuracy:>12.1%}" if local_accuracy is not None else f"{'-':>12}"
+        if llm_answers:
+            # Uncertain queries get the answer of the LLM screener
+            combined = list(llm_answers)
+            for answer, _, index in local:
+                combined[index] = answer
+            line += f"{accuracy(combined, queries):>14.1%}"
+        print(line)
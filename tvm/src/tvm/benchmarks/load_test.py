@@ -0,0 +1,230 @@
+import argparse
+import json
+import math
+import os
+import socket
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock, Thread
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env")
+
+import httpx
+import uvicorn
+from benchmarks.stub_llm import start_stub_server
+
+SAMPLE_INPUT = Path(__file__).parent / "sample_input.txt"
+BENCHMARK_USER = "benchmark"
+
+
+def configure_environment(stub_port: int, keep_caches: bool):
+    """
+    Point the LLMs at the stub, this must happen before the app is imported as the crews read it on import
+    """
+    os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{stub_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["DEFAULT_LLM"] = "openai/stub-default"
+    os.environ["REASONING_LLM"] = "openai/stub-reasoning"
+    os.environ.setdefault("CREW_VERBOSE", "false")
+    # The local relevance classifier would download and run an embedding model in the app under test
+    os.environ["RELEVANCE_CLASSIFIER"] = "false"
+    if not keep_caches:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+        os.environ["SEMANTIC_CACHE"] = "false"
+
+
+def benchmark_user():
+    """
+    The user the requests are made as, created on the first run
+    """
+    from db import SessionLocal
+    from models import User
+    from authentication import get_password_hash
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == BENCHMARK_USER).first()
+        if not user:
+            user = User(username=BENCHMARK_USER, hashed_password=get_password_hash(uuid.uuid4().hex), role="user")
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def start_app(override_authentication: bool = True) -> tuple:
+    """
+    Serve the app with uvicorn on a free port, authenticated as the benchmark user unless the requests
+    bring their own token
+    """
+    from main import app
+    from authentication import get_current_user
+
+    if override_authentication:
+        user = benchmark_user()
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    Nearest-rank percentile
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class StatementCounter:
+    """
+    Counts the SQL statements and commits sent over the engine of the in-process app
+    """
+
+    def __init__(self):
+        from sqlalchemy import event
+        from db import engine
+
+        self.statements = 0
+        self.commits = 0
+        self.lock = Lock()
+        event.listen(engine, "before_cursor_execute", self.on_statement)
+        event.listen(engine, "commit", self.on_commit)
+
+    def on_statement(self, *args):
+        with self.lock:
+            self.statements += 1
+
+    def on_commit(self, connection):
+        with self.lock:
+            self.commits += 1
+
+    def totals(self) -> tuple:
+        with self.lock:
+            return self.statements, self.commits
+
+
+def task_totals() -> dict:
+    from metrics import crew_metrics
+
+    totals = {}
+    with crew_metrics.task_seconds.lock:
+        for (task_name, status), (counts, total) in crew_metrics.task_seconds.series.items():
+            count, seconds = totals.get(task_name, (0, 0.0))
+            totals[task_name] = (count + sum(counts), seconds + total)
+    return totals
+
+
+def run_level(base_url: str, input_text: str, concurrency: int, requests: int, body: dict,
+              statement_counter: StatementCounter) -> dict:
+    """
+    Send the requests with the given number of concurrent clients and collect the latencies
+    """
+    before = task_totals()
+    statements_before, commits_before = statement_counter.totals()
+
+    def send(_) -> tuple:
+        # A unique reference per request, so no cache can answer it
+        data = {**body, "input": f"{input_text}\nReferentie: {uuid.uuid4().hex}"}
+        start = time.perf_counter()
+        try:
+            with httpx.Client(timeout=None) as client:
+                response = client.post(f"{base_url}/run", json=data)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    statements, commits = statement_counter.totals()
+    after = task_totals()
+    tasks = {}
+    for task_name, (count, seconds) in after.items():
+        count_before, seconds_before = before.get(task_name, (0, 0.0))
+        if count > count_before:
+            tasks[task_name] = (seconds - seconds_before) / (count - count_before)
+
+    latencies = [latency for latency, ok in results if ok]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(not ok for _, ok in results),
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50) if latencies else None,
+        "p95": percentile(latencies, 95) if latencies else None,
+        "p99": percentile(latencies, 99) if latencies else None,
+        "sql_statements": (statements - statements_before) / requests,
+        "commits": (commits - commits_before) / requests,
+        "task_seconds": tasks,
+    }
+
+
+def print_report(results: list):
+    print(f"{'concurrency':>12}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 s':>10}{'p95 s':>10}{'p99 s':>10}"
+          f"{'sql/req':>10}{'commit/req':>12}")
+    for result in results:
+        latencies = [f"{result[key]:>10.2f}" if result[key] is not None else f"{'-':>10}" for key in ("p50", "p95", "p99")]
+        print(f"{result['concurrency']:>12}{result['requests']:>10}{result['errors']:>8}{result['throughput']:>10.2f}"
+              + "".join(latencies) + f"{result['sql_statements']:>10.1f}{result['commits']:>12.1f}")
+
+    print()
+    print(f"{'task (mean s)':<32}" + "".join(f"{'c=' + str(result['concurrency']):>10}" for result in results))
+    for task_name in sorted({name for result in results for name in result["task_seconds"]}):
+        print(f"{task_name:<32}" + "".join(
+            f"{result['task_seconds'][task_name]:>10.2f}" if task_name in result["task_seconds"] else f"{'-':>10}"
+            for result in results
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test /run against a local stub LLM, without real LLM calls.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrent clients per level")
+    parser.add_argument("--requests", type=int, default=16, help="Number of requests per level")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds the stub waits before every answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra or less stub latency in seconds")
+    parser.add_argument("--process", choices=["hierarchical", "sequential"], help="Crew process for the requests")
+    parser.add_argument("--writing-mode", choices=["combined", "per_category"], help="Writing mode for the requests")
+    parser.add_argument("--input", type=Path, default=SAMPLE_INPUT, help="File with the advisory text to use")
+    parser.add_argument("--keep-caches", action="store_true", help="Leave the response and semantic caches enabled")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    parser.add_argument("--max-p95", type=float, help="Exit with status 1 when the p95 of any level exceeds this")
+    args = parser.parse_args()
+
+    stub = start_stub_server(latency=args.latency, jitter=args.jitter)
+    configure_environment(stub.server_address[1], args.keep_caches)
+    server, base_url = start_app()
+    counter = StatementCounter()
+
+    body = {key: value for key, value in (("process", args.process), ("writing_mode", args.writing_mode)) if value}
+    input_text = args.input.read_text(encoding="utf-8")
+    results = [run_level(base_url, input_text, concurrency, args.requests, body, counter)
+               for concurrency in args.concurrency]
+
+    server.should_exit = True
+    stub.shutdown()
+
+    print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.max_p95 is not None and any(result["p95"] is None or result["p95"] > args.max_p95 for result in results):
+        print(f"p95 above {args.max_p95} s or no successful requests", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,132 @@
+import argparse
+import json
+import random
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+
+SELECTION = [
+    {"category": "damage_to_third_parties", "sub_category": "minrisk"},
+    {"category": "damage_by_standstill", "sub_category": "risk_in_euros"},
+    {"category": "loss_of_personal_items", "sub_category": None},
+]
+
+RESEARCH = """Inventaris: 12 trekkers en 15 opleggers
+Per category, welk soort advies: aansprakelijkheid minimaal risico, stilstand risico in euro's
+Eigen risico: € 2.500 per gebeurtenis
+Verzekerd bedrag: € 2.500.000 per gebeurtenis
+Advies wordt opgevolgd: Ja
+Reden dat advies niet wordt opgevolgd: n.v.t.
+Overige context: geen"""
+
+ANALYSIS = json.dumps({"missing_template_options": [], "can_proceed": True, "notes": "Alles kan worden ingevuld."})
+
+FILLED_TEXT = ("damage_to_third_parties:\nTijdens de inventarisatie hebben wij vastgesteld dat uw bedrijf beschikt over "
+               "12 trekkers en 15 opleggers. U heeft aangegeven dat u mijn advies opvolgt.\n\n"
+               "damage_by_standstill:\nHet eigen risico bedraagt € 2.500 per gebeurtenis.\n\n"
+               "loss_of_personal_items:\nOver dit deel is geen advies gegeven.")
+
+# Recognizable parts of the prompts, checked in this order, and the answer to give
+ANSWERS = [
+    ('"YES" or "NO"', "YES"),
+    ("exact_category_name_from_database", json.dumps(SELECTION)),
+    ("ONTBREKENDE TEMPLATE OPTIES", FILLED_TEXT),
+    ("missing_template_options", ANALYSIS),
+    ("'Label: waarde'", RESEARCH),
+]
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI compatible chat completions endpoint with canned answers for the prompts of the Tvm crews
+    and the insurance filter, after a configurable delay
+    """
+
+    latency = 1.0
+    jitter = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        first_call = not any(message.get("role") == "assistant" for message in body.get("messages", []))
+        content = self.answer(prompt, first_call)
+        if body.get("stream"):
+            self.stream(body["model"], content)
+        else:
+            self.respond(body["model"], prompt, content)
+
+    @staticmethod
+    def answer(prompt: str, first_call: bool) -> str:
+        if "Use the Category Tool" in prompt and first_call:
+            # Let the category reader call its tool once, so the database is part of the benchmark
+            return "Thought: I need the categories from the database\nAction: Category Tool\nAction Input: {}"
+        answer = next((answer for marker, answer in ANSWERS if marker in prompt), "Alle categorieën zijn opgehaald.")
+        return f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+
+    def respond(self, model: str, prompt: str, content: str):
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        response = json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def stream(self, model: str, content: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for start in range(0, len(content), 40):
+            chunk = {
+                "id": "stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + 40]}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def start_stub_server(port: int = 0, latency: float = 1.0, jitter: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Start the stub on a background thread, port 0 picks a free port. Returns the server, stop it with shutdown().
+    """
+    handler = type("ConfiguredStubLLMHandler", (StubLLMHandler,), {"latency": latency, "jitter": jitter})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an OpenAI compatible stub LLM with canned answers.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds to wait before every answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra or less latency in seconds")
+    args = parser.parse_args()
+
+    stub = start_stub_server(args.port, args.latency, args.jitter)
+    print(f"Stub LLM listening on http://127.0.0.1:{stub.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.shutdown()
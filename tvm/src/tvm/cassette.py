@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from crewai import LLM
+from crewai.utilities.events import crewai_event_bus, LLMCallStartedEvent, LLMCallCompletedEvent, LLMStreamChunkEvent
+from crewai.utilities.events.llm_events import LLMCallType
+
+MODES = ("off", "record", "replay")
+
+
+class CassetteMissError(Exception):
+    pass
+
+
+class Cassette:
+    """
+    Stores LLM answers on disk, one JSON file per prompt hash.
+    LLM_CASSETTE=record saves every answer, LLM_CASSETTE=replay serves them without calling the LLM.
+    The settings are read on every call, so they can be changed without rebuilding the crews.
+    """
+
+    @staticmethod
+    def mode() -> str:
+        mode = os.environ.get("LLM_CASSETTE", "off").lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM_CASSETTE mode: {mode}")
+        return mode
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(os.environ.get("LLM_CASSETTE_DIR", Path(__file__).parent / "cassettes"))
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], tools: Optional[List[dict]]) -> str:
+        prompt = json.dumps({"model": model, "messages": messages, "tools": tools}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> str:
+        path = self.directory() / f"{key}.json"
+        if not path.exists():
+            raise CassetteMissError(f"No recorded answer for prompt {key} in {self.directory()}")
+        return json.loads(path.read_text(encoding="utf-8"))["response"]
+
+    def save(self, key: str, model: str, messages: List[Dict[str, str]], response: str):
+        directory = self.directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        recording = {"model": model, "messages": messages, "response": response}
+        # Write to a temporary file first, so concurrent calls never read half a recording
+        temporary = directory / f"{key}.{os.getpid()}.tmp"
+        temporary.write_text(json.dumps(recording, indent=2, ensure_ascii=False), encoding="utf-8")
+        temporary.replace(directory / f"{key}.json")
+
+
+cassette = Cassette()
+
+
+class CassetteLLM(LLM):
+    """
+    LLM that records its answers to, or replays them from, the cassette
+    """
+
+    def call(
+            self,
+            messages: Union[str, List[Dict[str, str]]],
+            tools: Optional[List[dict]] = None,
+            callbacks: Optional[List[Any]] = None,
+            available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        mode = cassette.mode()
+        if mode == "off":
+            return super().call(messages, tools, callbacks, available_functions)
+
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        key = cassette.key(self.model, messages, tools)
+
+        if mode == "replay":
+            crewai_event_bus.emit(self, event=LLMCallStartedEvent(messages=messages, tools=tools,
+                                                                  callbacks=callbacks,
+                                                                  available_functions=available_functions))
+            response = cassette.load(key)
+            if self.stream:
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=response))
+            crewai_event_bus.emit(self, event=LLMCallCompletedEvent(response=response,
+                                                                    call_type=LLMCallType.LLM_CALL))
+            return response
+
+        response = super().call(messages, tools, callbacks, available_functions)
+        if isinstance(response, str):
+            cassette.save(key, self.model, messages, response)
+        return response
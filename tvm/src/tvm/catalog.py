@@ -0,0 +1,167 @@
+import os
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def load_from_database() -> dict:
+    """
+    Read the categories with their subcategories and the advisory texts from the database, together with the rows
+    of the three tables for the read endpoints
+    """
+    from db import SessionLocal
+    from models import AdvisoryText, Category, SubCategory
+
+    db = SessionLocal()
+    try:
+        categories = {}
+        for category_name, subcategory_name in db.query(Category.name, SubCategory.name).join(
+                SubCategory, SubCategory.category_id == Category.id).order_by(Category.name, SubCategory.name):
+            categories.setdefault(category_name, []).append(subcategory_name)
+
+        # The rows by ID in the order the read endpoints list them, the categories by name like MySQL reads them
+        # from the unique index on the name
+        rows = {
+            "categories": {category.id: {"id": category.id, "name": category.name}
+                           for category in db.query(Category).order_by(Category.name)},
+            "subcategories": {subcategory.id: {"id": subcategory.id, "category_id": subcategory.category_id,
+                                               "name": subcategory.name}
+                              for subcategory in db.query(SubCategory).order_by(SubCategory.id)},
+            "advisory_texts": {advisorytext.id: {"id": advisorytext.id, "category": advisorytext.category,
+                                                 "sub_category": advisorytext.sub_category, "text": advisorytext.text}
+                               for advisorytext in db.query(AdvisoryText).order_by(AdvisoryText.id)}
+        }
+    finally:
+        db.close()
+
+    # The first text of a pair wins, like the LIMIT 1 of the advisory database tool
+    texts = {}
+    for advisorytext in rows["advisory_texts"].values():
+        texts.setdefault((advisorytext["category"], advisorytext["sub_category"]), advisorytext["text"])
+
+    return {"categories": categories, "texts": texts, "rows": rows}
+
+
+def normalize_pair(category: str, sub_category: Optional[str]) -> Tuple[str, Optional[str]]:
+    return category.strip().lower(), sub_category.strip().lower() if sub_category is not None else None
+
+
+def normalize_texts(texts: Dict[Tuple[str, Optional[str]], str]) -> Dict[Tuple[str, Optional[str]], str]:
+    """
+    The texts by normalized pair, the first text of pairs that only differ in case or spaces wins
+    """
+    normalized = {}
+    for pair, text in texts.items():
+        normalized.setdefault(normalize_pair(*pair), text)
+    return normalized
+
+
+class TemplateCatalog:
+    """
+    In-memory copy of the advisory text catalog (categories, subcategories and texts) with a version number.
+    The copy is loaded on first use and again after every change, so cached results that depend on the catalog
+    can be invalidated through the version. Changes made by another process are picked up after CATALOG_TTL seconds.
+    """
+
+    def __init__(self, load: Callable[[], dict] = load_from_database, ttl: float = 60):
+        self.load = load
+        self.ttl = ttl
+        self.version = 0
+        self.data = None
+        self.data_version = None
+        self.loaded_at = None
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self) -> int:
+        """
+        Mark the catalog as changed, must be called after every committed change to the catalog
+        """
+        with self.lock:
+            self.version += 1
+            return self.version
+
+    def snapshot(self) -> dict:
+        """
+        The current catalog, reloaded when it changed or is older than the time to live.
+        The returned data is shared and must not be modified.
+        """
+        with self.lock:
+            expired = self.loaded_at is not None and time.monotonic() - self.loaded_at > self.ttl
+            if self.data is not None and self.data_version == self.version and not expired:
+                self.hits += 1
+                return self.data
+            self.misses += 1
+            version = self.version
+
+        # Load outside the lock, a change during the load is caught by the version check of the next call
+        data = self.load()
+        data = {**data, "texts": normalize_texts(data["texts"])}
+        with self.lock:
+            if expired and self.data_version == version and data != self.data:
+                # Changed by another process, invalidate everything that depends on the old catalog
+                self.version += 1
+                version = self.version
+            self.data = data
+            self.data_version = version
+            self.loaded_at = time.monotonic()
+        return data
+
+    def current_version(self) -> int:
+        """
+        The version of the catalog, after reloading it when it is older than the time to live. Results cached with
+        an older version must not be used, also when another process changed the catalog.
+        """
+        self.snapshot()
+        with self.lock:
+            return self.version
+
+    def categories(self) -> Dict[str, List[str]]:
+        """
+        The categories that have subcategories, with their subcategories, both sorted by name
+        """
+        return self.snapshot()["categories"]
+
+    def text(self, category: str, sub_category: Optional[str]) -> Optional[str]:
+        return self.snapshot()["texts"].get(normalize_pair(category, sub_category))
+
+    def texts(self, pairs: List[Tuple[str, Optional[str]]]) -> List[Optional[str]]:
+        """
+        The text of every (category, sub_category) pair from a single snapshot, None for pairs without a text.
+        Like the collation of the database, the names match regardless of case and surrounding spaces.
+        """
+        texts = self.snapshot()["texts"]
+        return [texts.get(normalize_pair(*pair)) for pair in pairs]
+
+    def rows(self, table: str) -> List[dict]:
+        """
+        The rows of the categories, subcategories or advisory_texts table, as the read endpoints list them
+        """
+        return list(self.snapshot()["rows"][table].values())
+
+    def row(self, table: str, row_id: int) -> Optional[dict]:
+        return self.snapshot()["rows"][table].get(row_id)
+
+    def text_row(self, category: str, sub_category: str) -> Optional[dict]:
+        """
+        The first advisory text row of the pair, the names match like they do in text()
+        """
+        pair = normalize_pair(category, sub_category)
+        return next((advisorytext for advisorytext in self.rows("advisory_texts")
+                     if normalize_pair(advisorytext["category"], advisorytext["sub_category"]) == pair), None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else None,
+                "version": self.version,
+                "categories": len(self.data["categories"]) if self.data else 0,
+                "texts": len(self.data["texts"]) if self.data else 0
+            }
+
+
+template_catalog = TemplateCatalog(ttl=float(os.environ.get("CATALOG_TTL", 60)))
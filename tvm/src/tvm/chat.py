@@ -1,43 +1,60 @@
-from typing import List
-from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from main import app
-from db import get_db
+from db import delete_conversations, get_async_db
 from models import *
 from authentication import get_current_user
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, after_cursor, keyset_page
 
 
 @app.get("/conversations", response_model=List[ConversationResponse], tags=["Chat"])
 async def get_user_conversations(
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Returns all conversations of user
+    Returns a page of the conversations of user, newest first. The X-Next-Cursor header has the cursor of the
+    next page, it is left out on the last page.
     """
-    conversations = db.query(Conversation).filter(
-        Conversation.user_id == current_user.id
-    ).order_by(Conversation.created_at.desc()).all()
+    try:
+        statement = after_cursor(select(Conversation).filter(Conversation.user_id == current_user.id),
+                                 Conversation.created_at, Conversation.id, cursor, descending=True, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ongeldige cursor")
+    result = await db.execute(statement)
+    conversations, next_cursor = keyset_page(result.scalars().all(), limit)
 
     if not conversations:
         raise HTTPException(status_code=404, detail="Geen gesprekken gevonden!")
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return conversations
 
 
 @app.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse], tags=["Chat"])
 async def get_conversation_messages(
         conversation_id: int,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Returns all messages of conversation
+    Returns a page of the messages of conversation, oldest first. The X-Next-Cursor header has the cursor of the
+    next page, it is left out on the last page.
     """
-    conversation = db.query(Conversation).filter(
+    result = await db.execute(select(Conversation).filter(
         Conversation.id == conversation_id,
         Conversation.user_id == current_user.id
-    ).first()
+    ))
+    conversation = result.scalars().first()
 
     if not conversation:
         raise HTTPException(
@@ -45,13 +62,19 @@ async def get_conversation_messages(
             detail="Gesprek niet gevonden"
         )
 
-    messages = db.query(Message).filter(
-        Message.conversation_id == conversation_id
-    ).order_by(Message.created_at.asc()).all()
+    try:
+        statement = after_cursor(select(Message).filter(Message.conversation_id == conversation_id),
+                                 Message.created_at, Message.id, cursor, descending=False, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ongeldige cursor")
+    result = await db.execute(statement)
+    messages, next_cursor = keyset_page(result.scalars().all(), limit)
 
     if not messages:
         raise HTTPException(status_code=404, detail="Geen bericht(en) voor dit gesprek")
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return messages
 
 
@@ -59,24 +82,20 @@ async def get_conversation_messages(
 async def delete_conversation(
         conversation_id: int,
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Deletes conversation
     """
-    conversation = db.query(Conversation).filter(
-        Conversation.id == conversation_id,
-        Conversation.user_id == current_user.id
-    ).first()
+    deleted = await delete_conversations(db, Conversation.id == conversation_id, Conversation.user_id == current_user.id)
 
-    if not conversation:
+    if not deleted:
         raise HTTPException(
             status_code=404,
             detail="Gesprek niet gevonden"
         )
 
-    db.delete(conversation)
-    db.commit()
+    await db.commit()
 
     return {"message": f"Gesprek {conversation_id} succesvol verwijderd!"}
 
@@ -84,7 +103,7 @@ async def delete_conversation(
 @app.post("/conversations", response_model=ConversationResponse, tags=["Chat"])
 async def create_conversation(
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Creates a conversation
@@ -95,8 +114,8 @@ async def create_conversation(
     )
 
     db.add(new_conversation)
-    db.commit()
-    db.refresh(new_conversation)
+    await db.commit()
+    await db.refresh(new_conversation)
 
     return new_conversation
 
@@ -104,24 +123,17 @@ async def create_conversation(
 @app.delete("/conversations", tags=["Chat"])
 async def delete_all_conversations(
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
     Deletes all conversations of user
     """
-    conversations = db.query(Conversation).filter(
-        Conversation.user_id == current_user.id
-    ).all()
-
-    conversation_count = len(conversations)
+    conversation_count = await delete_conversations(db, Conversation.user_id == current_user.id)
 
     if conversation_count == 0:
         return {"message": "Geen gesprekken gevonden"}
 
-    for conversation in conversations:
-        db.delete(conversation)
-
-    db.commit()
+    await db.commit()
 
     return {
         "message": f"Alle {conversation_count} gesprekken succesvol verwijderd!",
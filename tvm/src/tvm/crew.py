@@ -1,11 +1,50 @@
 import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
 from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task, llm
+from crewai.crews.crew_output import CrewOutput
+from crewai.project import CrewBase, agent, task, llm
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-from tools.db_tool import advisory_db_tool
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.types.usage_metrics import UsageMetrics
+from typing import Callable, Dict, List, Optional
 from tools.category_tool import category_tool
 from tools.db_multiple_text_tool import multi_advisory_db_tool
+from template_fetcher import template_fetcher
+from template_engine import template_engine
+from catalog import template_catalog
+from semantic_cache import semantic_cache
+from progress import progress_tracker, RunProgress
+from metrics import crew_metrics
+from cassette import CassetteLLM
+from routed_task import RoutedTask
+
+
+class RunCancelledError(Exception):
+    pass
+
+
+class CrewSet:
+    """
+    Agents for one run at a time and the crews built on them. An agent keeps the executor of the task it runs,
+    the LLM a routed task swapped in and its token usage, so a set is never shared by runs that are in progress.
+    """
+
+    def __init__(self, agents: List[BaseAgent]):
+        self.agents = agents
+        self.crews: Dict[str, Crew] = {}
+
+    def agent(self, role: str) -> BaseAgent:
+        return next(crew_agent for crew_agent in self.agents if crew_agent.role == role)
+
+    def reset(self):
+        """
+        Starts a run without the token usage and retry count of the previous run on this set
+        """
+        for crew_agent in self.agents:
+            crew_agent._token_process = TokenProcess()
+            crew_agent._times_executed = 0
 
 
 @CrewBase
@@ -18,12 +57,35 @@ class Tvm():
     OPEN_API_KEY = os.environ.get("OPENAI_API_KEY")
     DEFAULT_LLM = os.environ.get("DEFAULT_LLM")
     REASONING_LLM = os.environ.get("REASONING_LLM")
+    # The category lookup and the research only run concurrently in a sequential crew, see run_concurrently
+    CREW_PROCESS = os.environ.get("CREW_PROCESS", Process.hierarchical.value)
+    WRITING_MODE = os.environ.get("WRITING_MODE", "combined")
+    WRITING_CONCURRENCY = int(os.environ.get("WRITING_CONCURRENCY", 4))
+    PREFILL_TEMPLATES = os.environ.get("PREFILL_TEMPLATES", "true").lower() == "true"
+    SEMANTIC_CACHE = os.environ.get("SEMANTIC_CACHE", "false").lower() == "true"
+    VERBOSE = os.environ.get("CREW_VERBOSE", "true").lower() == "true"
+    LLM_PROFILE = os.environ.get("LLM_PROFILE", "routed")
+    NO_TEMPLATE_TEXT = "Over dit deel is geen advies gegeven."
     agents: List[BaseAgent]
     tasks: List[Task]
 
+    def __init__(self, process: Optional[str] = None, writing_mode: Optional[str] = None,
+                 llm_profile: Optional[str] = None):
+        self.process = Process(process or self.CREW_PROCESS)
+        self.writing_mode = writing_mode or self.WRITING_MODE
+        if self.writing_mode not in ("combined", "per_category"):
+            raise ValueError(f"Unknown writing mode: {self.writing_mode}")
+        self.llm_profile = llm_profile or self.LLM_PROFILE
+        if self.llm_profile not in ("routed", "reasoning"):
+            raise ValueError(f"Unknown LLM profile: {self.llm_profile}")
+        self.prototype_crews = {}
+        self.prototype_lock = Lock()
+        self.idle_crew_sets: List[CrewSet] = []
+        self.crew_sets_lock = Lock()
+
     @llm
     def default_crew_llm(self) -> LLM:
-        return LLM(
+        return CassetteLLM(
             model=self.DEFAULT_LLM,
             temperature=0.0,
             api_base=self.OPEN_API_BASE,
@@ -32,7 +94,7 @@ class Tvm():
 
     @llm
     def reasoning_llm(self) -> LLM:
-        return LLM(
+        return CassetteLLM(
             model=self.REASONING_LLM,
             temperature=0.0,
             api_base=self.OPEN_API_BASE,
@@ -43,53 +105,61 @@ class Tvm():
     def reader(self) -> Agent:
         return Agent(
             config=self.agents_config["reader"],
-            verbose=True,
+            verbose=self.VERBOSE,
             llm=self.reasoning_llm(),
             tools=[category_tool],
         )
 
     @agent
-    def writer(self) -> Agent:
+    def category_reader(self) -> Agent:
         return Agent(
-            config=self.agents_config["writer"],
-            verbose=True,
+            config=self.agents_config["category_reader"],
+            verbose=self.VERBOSE,
             llm=self.reasoning_llm(),
+            tools=[category_tool],
         )
 
     @agent
-    def db_specialist(self) -> Agent:
-        """
-        Gespecialiseerde agent voor database operaties
-        """
+    def writer(self) -> Agent:
         return Agent(
-            role="Database Specialist",
-            goal="Retrieve exact advisory text templates from the advisory_texts table using category and sub_category fields",
-            backstory="""You are an expert at database operations. You work with the advisory_texts table which has these exact columns:
-            - id (Integer, primary key)
-            - category (String 255)
-            - sub_category (String 255) 
-            - text (Text)
-
-            You always retrieve the actual text content from the database, never SQL statements. You understand this table structure perfectly.""",
-            verbose=True,
-            llm=self.default_crew_llm(),
-            tools=[advisory_db_tool, multi_advisory_db_tool],
+            config=self.agents_config["writer"],
+            verbose=self.VERBOSE,
+            llm=self.reasoning_llm(),
+            tools=[multi_advisory_db_tool],
         )
 
     def manager(self) -> Agent:
         return Agent(
             config=self.agents_config["manager"],
-            verbose=True,
+            verbose=self.VERBOSE,
             allow_delegation=True,
             llm=self.reasoning_llm()
         )
 
+    def task_llm(self, task_name: str) -> Optional[LLM]:
+        """
+        The LLM that tasks.yaml routes the task to in the routed profile ('default' or 'reasoning').
+        None keeps the LLM of the agent, which is the reasoning LLM.
+        """
+        if self.llm_profile != "routed":
+            return None
+        routes = {"default": self.default_crew_llm, "reasoning": self.reasoning_llm}
+        route = self.tasks_config.get(task_name, {}).get("llm")
+        return routes[route]() if route in routes else None
+
+    def run_concurrently(self) -> bool:
+        """
+        Independent tasks only run concurrently in a sequential crew, as a hierarchical crew executes every task
+        through the same manager agent
+        """
+        return self.process == Process.sequential
+
     @task
     def get_available_categories(self) -> Task:
         """
         Simple task to get all available categories and subcategories
         """
-        return Task(
+        return RoutedTask(
             description="""
                 Use the Category Tool to get all available categories and subcategories from the database.
 
@@ -97,27 +167,35 @@ class Tvm():
                 associated subcategories that exist in the system.
                 """,
             expected_output="A JSON structure containing all categories and their subcategories from the database.",
-            agent=self.reader()
+            agent=self.category_reader(),
+            llm=self.task_llm("get_available_categories"),
+            async_execution=self.run_concurrently()
         )
 
     @task
     def research(self) -> Task:
-        return Task(
-            description="Read the entire input and extract the necessary data for the writer. Look at {input}",
+        return RoutedTask(
+            description="""Read the entire input and extract the necessary data for the writer. Look at {input}
+            Write every item on its own line as 'Label: waarde', using the labels of the expected output.
+            Start the items of every category the input is about with the line 'Categorie: <naam>', using exactly
+            one of these category names: {categories}
+            Only write an item in the section of a category when the input says it for that category.""",
             expected_output="""Inventaris
-            Per category, welk soort advies.
+            Overige context
+            Per category, starting with 'Categorie: <naam>':
+            Welk soort advies
             Eigen risico
             Verzekerd bedrag
             Advies wordt opgevolgd
-            Reden dat advies niet wordt opgevolgd indien van toepassing
-            Overige context""",
+            Reden dat advies niet wordt opgevolgd indien van toepassing""",
             agent=self.reader(),
-            context=[self.get_available_categories()]
+            llm=self.task_llm("research"),
+            async_execution=self.run_concurrently()
         )
 
     @task
     def decide_template_category(self) -> Task:
-        return Task(
+        return RoutedTask(
             description="""
                 Analyze the research context and available categories to determine which advisory 
                 text(s) best fits the client's needs.
@@ -139,40 +217,16 @@ class Tvm():
                 """,
             expected_output="A JSON object with 'category' and 'sub_category' fields containing exact database values.",
             agent=self.reader(),
+            llm=self.task_llm("decide_template_category"),
             context=[self.research(), self.get_available_categories()]
         )
 
-    @task
-    def fetch_template_from_db(self) -> Task:
-        return Task(
-            description="""
-                Use the Multi-Advisory Database Tool to retrieve the ACTUAL advisory text(s) from the advisory_texts table.
-
-                STEP-BY-STEP PROCESS:
-                1. Parse the JSON from the previous task. It contains a list of objects, each with a `category` and `sub_category`.
-                2. Use the Multi-Advisory Database Tool, passing in the full list of {category, sub_category} pairs exactly as provided.
-                3. The tool will perform a single query using:
-                   SELECT text FROM advisory_texts WHERE (category, sub_category) IN ((...), (...), ...)
-                4. Return all matching advisory texts as a list, preserving the order of results from the database.
-
-                CRITICAL: 
-                - You MUST return the actual text content, not SQL statements
-                - If no exact match found, the tool will show available alternatives
-                - Handle any partial matches appropriately
-                - If a sub_category is marked as null, do NOT try to run the tool, instead return the text for that category as: {"category": "category", "text": null}
-                - You should return ALL the templates that were requested, not just one.
-                """,
-            expected_output="The complete Dutch advisory text template(s) from the advisory_texts.text column.",
-            agent=self.db_specialist(),
-            context=[self.decide_template_category()]
-        )
-
     @task
     def analyze_template_requirements(self) -> Task:
         """
         Analyze the template for missing options and placeholders that cannot be determined
         """
-        return Task(
+        return RoutedTask(
             description="""
                 Analyze the retrieved template to identify any placeholders or choice options that cannot be clearly determined from: {input}
 
@@ -183,6 +237,15 @@ class Tvm():
                 4. Apply specific rules for common placeholders to minimize false positives
                 5. Only mark as missing if truly ambiguous after applying specific placeholder rules
 
+                Placeholders that follow directly from the research have already been filled in, choices have not.
+                If a template lists 'open_slots', only those slots still have to be analyzed.
+
+                TEMPLATE(S) RETRIEVED FROM THE DATABASE:
+                {templates}
+
+                RESEARCH CONTEXT:
+                {research}
+
                 SPECIFIC PLACEHOLDER RULES (to minimize false positives):
                 - [beleid_klant]: Look for any mention of risk amounts (euros) or risk minimization approach - if found, can be filled
                 - [eigen_risico]: Look for any mention of deductible amounts (euros) - there might be multiple so mention them all
@@ -223,17 +286,17 @@ class Tvm():
                 """,
             expected_output="Een JSON analyse van alleen de werkelijk onduidelijke template opties waar absoluut geen relevante informatie voor beschikbaar is.",
             agent=self.reader(),
-            context=[self.research(), self.fetch_template_from_db()]
+            llm=self.task_llm("analyze_template_requirements")
         )
 
     @task
     def fill_in_template(self) -> Task:
-        return Task(
+        return RoutedTask(
             description="""
                 Fill in the advisory template(s) with specific information from the research context.
 
                 PROCESS:
-                1. Take the template text(s) retrieved from the database.
+                1. Take the template text(s) retrieved from the database. Text that has already been filled in was taken from the research, check it against the research and correct it when it does not match the category. To correct a filled in value, look up the original templates of all categories at once with the Multi-Advisory Database Tool. The 'open_slots' still have to be filled in.
                 2. Review the template analysis for any missing template options
                 3. Look for placeholder variables (marked as '[variable_name]') and replace them with appropriate values
                 4. Areas in parenthesis '()' are choices with options separated by '/'. You must keep ONLY the text before OR after the slash
@@ -271,22 +334,294 @@ class Tvm():
                 - No assumptions about unclear choices
                 - Professional language throughout
                 - Grammar and spelling must be correct
+
+                TEMPLATE(S) RETRIEVED FROM THE DATABASE:
+                {templates}
+
+                RESEARCH CONTEXT:
+                {research}
                 """,
             expected_output="Een Nederlands adviessjabloon waarbij alleen expliciete informatie is ingevuld en onduidelijke template keuzes zijn gemarkeerd als [ONTBREEKT: ...] met onderaan een overzicht van wat nog bepaald moet worden.",
             agent=self.writer(),
-            context=[self.research(), self.get_available_categories(), self.fetch_template_from_db(),
-                     self.analyze_template_requirements()]
+            llm=self.task_llm("fill_in_template"),
+            context=[self.analyze_template_requirements()]
         )
 
-    @crew
-    def crew(self) -> Crew:
+    def build_crew(self, agents: List[BaseAgent], tasks: List[Task], manager: Optional[BaseAgent] = None) -> Crew:
         """
-        Creates the Tvm crew
+        Creates a crew for the process of this instance, hierarchical crews get a manager agent
         """
+        if self.process == Process.hierarchical:
+            return Crew(
+                agents=agents,
+                tasks=tasks,
+                process=self.process,
+                verbose=self.VERBOSE,
+                manager_agent=manager or self.manager()
+            )
         return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
-            process=Process.hierarchical,
-            verbose=True,
-            manager_agent=self.manager()
+            agents=agents,
+            tasks=tasks,
+            process=self.process,
+            verbose=self.VERBOSE
+        )
+
+    def selection_crew(self) -> Crew:
+        """
+        Creates the crew that researches the input and decides which templates to use.
+        Retrieving the categories and the research run concurrently in a sequential crew.
+        """
+        return self.build_crew(
+            agents=[self.category_reader(), self.reader()],
+            tasks=[self.get_available_categories(), self.research(), self.decide_template_category()]
+        )
+
+    def writing_crew(self) -> Crew:
+        """
+        Creates the crew that analyzes and fills in the fetched templates
+        """
+        return self.build_crew(
+            agents=[self.reader(), self.writer()],
+            tasks=[self.analyze_template_requirements(), self.fill_in_template()]
         )
+
+    def prototype_crew(self, build_crew: Callable[[], Crew]) -> Crew:
+        """
+        The crew made by build_crew, built once per instance. It is never run, runs use the agents of a crew set
+        and copies of its tasks.
+        """
+        with self.prototype_lock:
+            if build_crew.__name__ not in self.prototype_crews:
+                self.prototype_crews[build_crew.__name__] = build_crew()
+            return self.prototype_crews[build_crew.__name__]
+
+    def checkout_crew_set(self) -> CrewSet:
+        """
+        An idle crew set for a run, a new one is only made when all sets are in use by other runs.
+        Every agent of a set has its own copy of its LLM, as streaming is switched on per LLM.
+        """
+        with self.crew_sets_lock:
+            crew_set = self.idle_crew_sets.pop() if self.idle_crew_sets else None
+        if crew_set is None:
+            crew_set = CrewSet([self.category_reader().copy(), self.reader().copy(), self.writer().copy(),
+                                self.manager()])
+        crew_set.reset()
+        return crew_set
+
+    def checkin_crew_sets(self, crew_sets: List[CrewSet]):
+        """
+        Hands the crew sets of a finished run to the next runs
+        """
+        with self.crew_sets_lock:
+            self.idle_crew_sets.extend(crew_sets)
+
+    def fresh_crew(self, build_crew: Callable[[], Crew], crew_set: CrewSet) -> Crew:
+        """
+        The crew made by build_crew on the agents of the crew set, with new tasks. The crew is built once per set,
+        only the tasks are copied from the prototype for every run, as they keep the interpolated descriptions
+        and outputs of the run.
+        """
+        prototype = self.prototype_crew(build_crew)
+        tasks = {}
+        for prototype_task in prototype.tasks:
+            tasks[prototype_task.key] = prototype_task.copy(crew_set.agents, tasks)
+        crew = crew_set.crews.get(build_crew.__name__)
+        if crew is None:
+            crew = self.build_crew(agents=[crew_set.agent(crew_agent.role) for crew_agent in prototype.agents],
+                                   tasks=list(tasks.values()),
+                                   manager=crew_set.agent(prototype.manager_agent.role) if prototype.manager_agent
+                                   else None)
+            crew_set.crews[build_crew.__name__] = crew
+        else:
+            crew.tasks = list(tasks.values())
+        return crew
+
+    def warm_up(self) -> "Tvm":
+        """
+        Builds the agents, tasks and crews up front instead of during the first request
+        """
+        crew_set = self.checkout_crew_set()
+        self.fresh_crew(self.selection_crew, crew_set)
+        self.fresh_crew(self.writing_crew, crew_set)
+        self.checkin_crew_sets([crew_set])
+        return self
+
+    def kickoff(self, inputs: dict, progress: Optional[RunProgress] = None,
+                screening: Optional[Future] = None) -> CrewOutput:
+        """
+        Runs the Tvm pipeline: the selection crew, a code-level template fetch and the writing crew(s).
+        The selection crew is skipped when the semantic cache has the outputs of a nearly identical input.
+        The token usage of all crews is combined in the result. With progress, the task events, the chosen
+        categories and the streamed text of the fill in task are sent to it while the crews run.
+        With screening, a future of the relevance screening that runs alongside the selection crew, the run
+        waits for it after the selection and raises RunCancelledError when the input was rejected.
+        """
+        crew_sets = [self.checkout_crew_set()]
+        try:
+            return self.run_pipeline(inputs, progress, screening, crew_sets)
+        finally:
+            self.checkin_crew_sets(crew_sets)
+
+    def run_pipeline(self, inputs: dict, progress: Optional[RunProgress], screening: Optional[Future],
+                     crew_sets: List[CrewSet]) -> CrewOutput:
+        """
+        The pipeline of kickoff on the first crew set, the crew sets of per-category jobs are added to crew_sets
+        """
+        start = time.perf_counter()
+        if screening is not None and screening.done() and not screening.result():
+            raise RunCancelledError()
+        # The research marks the section of every category with one of these names
+        inputs = {**inputs, "categories": ", ".join(template_catalog.categories())}
+
+        # A nearly identical earlier input has the same category decision and research
+        cached = None
+        if self.SEMANTIC_CACHE:
+            embedding = semantic_cache.embed(inputs["input"])
+            cached = semantic_cache.lookup(inputs["input"], embedding)
+
+        if cached:
+            outputs = {"decide_template_category": cached["decision"], "research": cached["research"]}
+            selection_crews = []
+        else:
+            selection_crew = self.fresh_crew(self.selection_crew, crew_sets[0])
+            selection = self.run_crew(selection_crew, inputs, progress)
+            outputs = {task_output.name: task_output.raw for task_output in selection.tasks_output}
+            selection_crews = [selection_crew]
+
+        # Nothing of a rejected input is cached or written, the selection tokens are still counted
+        if screening is not None and not screening.result():
+            crew_metrics.record_agent_usage(self.distinct_agents(*selection_crews))
+            raise RunCancelledError()
+
+        # Fetch the chosen templates directly instead of through an agent
+        chosen_templates = template_fetcher.parse_selection(outputs["decide_template_category"])
+        templates = template_fetcher.fetch(chosen_templates)
+        if self.SEMANTIC_CACHE and not cached and chosen_templates:
+            semantic_cache.add(inputs["input"], embedding, outputs["decide_template_category"], outputs["research"])
+        if progress:
+            progress.emit("categories", categories=chosen_templates)
+        if self.PREFILL_TEMPLATES:
+            templates = template_engine.prefill(templates, outputs["research"])
+
+        # Without any template text the per-category path just merges the 'no advice' texts
+        per_category = self.writing_mode == "per_category" or not any(map(self.needs_writing, templates))
+        if per_category and templates:
+            result, writing_crews = self.write_per_category(inputs, outputs["research"], templates, crew_sets,
+                                                            progress)
+        else:
+            writing_crew = self.fresh_crew(self.writing_crew, crew_sets[0])
+            writing_inputs = self.writing_inputs(inputs, outputs["research"], templates)
+            result = self.run_crew(writing_crew, writing_inputs, progress, stream=True)
+            writing_crews = [writing_crew]
+
+        agents = self.distinct_agents(*selection_crews, *writing_crews)
+        result.token_usage = self.usage_metrics(agents)
+        crew_metrics.record_agent_usage(agents)
+        crew_metrics.kickoff_seconds.observe(time.perf_counter() - start, process=self.process.value,
+                                             writing_mode=self.writing_mode)
+        return result
+
+    @staticmethod
+    def run_crew(crew: Crew, inputs: dict, progress: Optional[RunProgress], category: Optional[str] = None,
+                 stream: bool = False) -> CrewOutput:
+        """
+        Kicks off the crew, sending its events to the progress when there is one
+        """
+        if not progress:
+            return crew.kickoff(inputs=inputs)
+        progress_tracker.watch(crew, progress, category=category, stream=stream)
+        try:
+            return crew.kickoff(inputs=inputs)
+        finally:
+            progress_tracker.unwatch(crew)
+
+    @staticmethod
+    def writing_inputs(inputs: dict, research: str, templates: List[dict]) -> dict:
+        return {
+            **inputs,
+            "research": research,
+            "templates": template_fetcher.format_templates(templates),
+        }
+
+    def write_per_category(self, inputs: dict, research: str, templates: List[dict], crew_sets: List[CrewSet],
+                           progress: Optional[RunProgress] = None) -> tuple:
+        """
+        Analyzes and fills in every template with its own writing crew, at most WRITING_CONCURRENCY at a time.
+        Categories without a template don't need the LLM. The results are merged in category order.
+        """
+        # Every job gets its own crew set, so the jobs don't share agents or task outputs
+        jobs = []
+        for template in templates:
+            crew = None
+            if self.needs_writing(template):
+                crew_sets.append(self.checkout_crew_set())
+                crew = self.fresh_crew(self.writing_crew, crew_sets[-1])
+            jobs.append((template, crew))
+
+        def write(job: tuple) -> CrewOutput:
+            template, crew = job
+            if crew is None:
+                return CrewOutput(raw=f"{template['category']}:\n{template['text'] or self.NO_TEMPLATE_TEXT}")
+            writing_inputs = self.writing_inputs(inputs, research, [template])
+            return self.run_crew(crew, writing_inputs, progress, category=template["category"], stream=True)
+
+        with ThreadPoolExecutor(max_workers=self.WRITING_CONCURRENCY) as executor:
+            outputs = list(executor.map(write, jobs))
+
+        result = CrewOutput(
+            raw="\n\n".join(output.raw for output in outputs),
+            tasks_output=[task_output for output in outputs for task_output in output.tasks_output]
+        )
+        return result, [crew for _, crew in jobs if crew is not None]
+
+    @staticmethod
+    def needs_writing(template: dict) -> bool:
+        """
+        A template needs the writing crew unless it has no text. A template that was prefilled without open slots
+        still goes to the writer, which checks the filled in values against the research.
+        """
+        return template["text"] is not None
+
+    @staticmethod
+    def distinct_agents(*crews: Crew) -> List[BaseAgent]:
+        """
+        Every distinct agent in the given crews, including the managers.
+        Agents can be shared between crews and keep a running total, so the crews' own metrics can't simply be added.
+        """
+        agents = {}
+        for crew in crews:
+            for crew_agent in [*crew.agents, crew.manager_agent]:
+                if crew_agent is not None:
+                    agents[id(crew_agent)] = crew_agent
+        return list(agents.values())
+
+    @staticmethod
+    def usage_metrics(agents: List[BaseAgent]) -> UsageMetrics:
+        """
+        Sums the token usage of the given agents
+        """
+        token_usage = UsageMetrics()
+        for crew_agent in agents:
+            token_usage.add_usage_metrics(crew_agent._token_process.get_summary())
+        return token_usage
+
+
+class TvmFactory:
+    """
+    Keeps one prebuilt Tvm per process and writing mode, so requests don't rebuild the configuration, LLMs,
+    agents and crews. Tvm.kickoff runs on a crew set of its own with new tasks, which makes the instances safe to share.
+    """
+
+    def __init__(self):
+        self.instances = {}
+        self.lock = Lock()
+
+    def get(self, process: Optional[str] = None, writing_mode: Optional[str] = None) -> Tvm:
+        key = (Process(process or Tvm.CREW_PROCESS), writing_mode or Tvm.WRITING_MODE)
+        with self.lock:
+            if key not in self.instances:
+                self.instances[key] = Tvm(*key)
+            return self.instances[key]
+
+
+tvm_factory = TvmFactory()
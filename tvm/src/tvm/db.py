@@ -1,12 +1,16 @@
 from models import *
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, delete, select, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 import os
 from dotenv import load_dotenv
 import subprocess
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.engine.url import make_url
+from metrics import pool_metrics
+from catalog import template_catalog
 import embedchain.loaders.mysql as mysql_loader_module
 
 _original_init = mysql_loader_module.MySQLLoader.__init__
@@ -31,11 +35,68 @@ def patched_init(self, config):
 mysql_loader_module.MySQLLoader.__init__ = patched_init
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQL_CONNECTION")
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Every engine of the process gets its own pool with these settings, so one process can open at most
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+# The one engine of the process, the sessions, the crew tools and the init scripts share its connection pool
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool_metrics.timed(QueuePool, "main"), **POOL_OPTIONS)
+pool_metrics.watch("main", engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async drivers of the databases SQL_CONNECTION can point to
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """
+    The URL of the async engine, ASYNC_SQL_CONNECTION or SQL_CONNECTION with the async driver of its database
+    """
+    if os.getenv("ASYNC_SQL_CONNECTION"):
+        return os.getenv("ASYNC_SQL_CONNECTION")
+    parsed_url = make_url(url)
+    backend = parsed_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for the '{backend}' database of SQL_CONNECTION, "
+                         f"set ASYNC_SQL_CONNECTION to the URL of the database with an async driver")
+    return parsed_url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# Engine of the async def endpoints, so their queries don't block the event loop
+async_engine = create_async_engine(
+    async_database_url(SQLALCHEMY_DATABASE_URL),
+    poolclass=pool_metrics.timed(AsyncAdaptedQueuePool, "async"),
+    **POOL_OPTIONS
+)
+pool_metrics.watch("async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base.metadata.create_all(bind=engine)
 
+
+def create_missing_indexes():
+    """
+    create_all only creates the indexes of new tables, add the indexes that were introduced later to existing ones
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+create_missing_indexes()
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
@@ -47,6 +108,24 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def delete_conversations(db: AsyncSession, *criteria) -> int:
+    """
+    Deletes the conversations that match the criteria and their messages with two DELETE statements, without
+    loading them into the session. Returns the number of deleted conversations, the caller commits.
+    """
+    conversation_ids = select(Conversation.id).where(*criteria)
+    # Nothing to synchronize, the rows are never loaded, and fetching the ids would load every message id
+    await db.execute(delete(Message).where(Message.conversation_id.in_(conversation_ids)),
+                     execution_options={"synchronize_session": False})
+    result = await db.execute(delete(Conversation).where(*criteria), execution_options={"synchronize_session": False})
+    return result.rowcount
+
+
 # Method that inserts the data from the initial database to prevent errors
 def insert_base_data():
     db = SessionLocal()
@@ -177,6 +256,7 @@ def insert_base_data():
     db.add(new_message6)
     db.commit()
     db.close()
+    template_catalog.bump()
 
 
 # Resets the database, used for unit testing
@@ -201,6 +281,7 @@ def reset_database():
 
             conn.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
             trans.commit()
+            template_catalog.bump()
         except Exception as e:
             trans.rollback()
             print("Failed to reset database:", e)
@@ -210,6 +291,7 @@ def reset_database():
 # Method that runs init_db.py automatically
 def run_init_db():
     subprocess.run(["python", "init_db.py"], check=True)
+    template_catalog.bump()
 
 
 def get_password_hash(password):
@@ -0,0 +1,33 @@
+import os
+from threading import Lock
+from typing import List
+import numpy as np
+
+
+class EmbeddingModel:
+    """
+    Lazily loaded sentence-transformers model, the model is only loaded when the first text is embedded
+    """
+
+    EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
+
+    def __init__(self):
+        self.model = None
+        self.lock = Lock()
+
+    def load(self):
+        with self.lock:
+            if self.model is None:
+                from sentence_transformers import SentenceTransformer
+                self.model = SentenceTransformer(self.EMBEDDING_MODEL)
+            return self.model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed the texts as rows of unit length, so the dot product of two rows is their cosine similarity
+        """
+        model = self.model or self.load()
+        return np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+embedding_model = EmbeddingModel()
@@ -1,5 +1,8 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from crewai import Agent, Task, Crew, LLM
 import os
+from cassette import CassetteLLM
+from relevance_classifier import relevance_classifier
 
 
 class InsuranceFilterService:
@@ -10,16 +13,35 @@ class InsuranceFilterService:
     OPEN_API_BASE = os.environ.get("OPENAI_API_BASE")
     OPEN_API_KEY = os.environ.get("OPENAI_API_KEY")
     DEFAULT_LLM = os.environ.get("DEFAULT_LLM")
+    # Off until benchmarks/eval_relevance.py has calibrated the margin against the real model
+    RELEVANCE_CLASSIFIER = os.environ.get("RELEVANCE_CLASSIFIER", "false").lower() == "true"
+    SCREENING_WORKERS = int(os.environ.get("SCREENING_WORKERS", 4))
+    SCREENING_MODE = os.environ.get("SCREENING_MODE", "direct")
+    SCREENING_PROMPT = 'Is this query about insurance, financial advisory, or business risk management? Answer with only "YES" or "NO".'
 
     def default_llm(self) -> LLM:
-        return LLM(
+        return CassetteLLM(
             model=self.DEFAULT_LLM,
             temperature=0.3,
             api_base=self.OPEN_API_BASE,
             api_key=self.OPEN_API_KEY,
         )
 
+    def screening_llm(self) -> LLM:
+        """
+        LLM for the direct screening, a single word answer needs no more than a few tokens
+        """
+        return CassetteLLM(
+            model=self.DEFAULT_LLM,
+            temperature=0.0,
+            max_tokens=3,
+            api_base=self.OPEN_API_BASE,
+            api_key=self.OPEN_API_KEY,
+        )
+
     def __init__(self):
+        if self.SCREENING_MODE not in ("direct", "crew"):
+            raise ValueError(f"Unknown screening mode: {self.SCREENING_MODE}")
         self.screener_agent = Agent(
             role="Insurance Query Screener",
             goal="Determine if a query is about insurance or financial advisory",
@@ -27,8 +49,53 @@ class InsuranceFilterService:
             llm=self.default_llm(),
             verbose=True
         )
+        # One LLM for every direct screening, it holds no state between calls
+        self.direct_llm = self.screening_llm()
+        self.executor = ThreadPoolExecutor(max_workers=self.SCREENING_WORKERS, thread_name_prefix="tvm-screening")
 
     def screen_query(self, query: str) -> bool:
+        """
+        Screens the query with the local classifier when it is enabled, other queries are screened by the LLM
+        """
+        if self.RELEVANCE_CLASSIFIER:
+            try:
+                is_relevant = relevance_classifier.classify(query)
+                if is_relevant is not None:
+                    return is_relevant
+            except Exception as e:
+                # Usually the embedding model could not be loaded, don't try again on every query
+                print(f"Relevance classifier failed, using the LLM screener from now on: {e}")
+                self.RELEVANCE_CLASSIFIER = False
+
+        return self.screen_with_llm(query)
+
+    def start_screening(self, query: str) -> Future:
+        """
+        Screens the query on a background thread, so the crew can start at the same time
+        """
+        return self.executor.submit(self.screen_query, query)
+
+    def screen_with_llm(self, query: str) -> bool:
+        if self.SCREENING_MODE == "direct":
+            return self.screen_directly(query)
+        return self.screen_with_crew(query)
+
+    def screen_directly(self, query: str) -> bool:
+        """
+        Asks the question as a single completion, without the prompt and reasoning of an agent
+        """
+        try:
+            answer = self.direct_llm.call([
+                {"role": "system", "content": self.SCREENING_PROMPT},
+                {"role": "user", "content": query}
+            ])
+            return "YES" in str(answer).upper()
+
+        except Exception as e:
+            print(f"Filter failed: {e}")
+            return True
+
+    def screen_with_crew(self, query: str) -> bool:
         try:
             filter_task = Task(
                 description=f"""
@@ -39,7 +106,8 @@ class InsuranceFilterService:
                 Answer with only "YES" or "NO".
                 """,
                 expected_output="A single word: YES or NO",
-                agent=self.screener_agent
+                agent=self.screener_agent,
+                name="screen_query"
             )
 
             screening_crew = Crew(
@@ -1,15 +1,11 @@
 from getpass import getpass
 from dotenv import load_dotenv
 from passlib.context import CryptContext
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import os
 from models import User
 
 load_dotenv(dotenv_path="../../.env")
-SQLALCHEMY_DATABASE_URL = os.getenv("SQL_CONNECTION")
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# After the environment is loaded, db creates its engine with the pool settings from it
+from db import SessionLocal
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
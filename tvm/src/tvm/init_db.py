@@ -1,14 +1,13 @@
 import json
 from dotenv import load_dotenv
 from models import AdvisoryText, Category, SubCategory
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-import os
 
 load_dotenv(dotenv_path="../../.env")
-engine = create_engine(os.getenv("SQL_CONNECTION"))
-Session = sessionmaker(bind=engine)
-session = Session()
+# After the environment is loaded, db creates its engine with the pool settings from it
+from db import SessionLocal
+
+# Autoflush, so the duplicate checks also see the rows added in this session
+session = SessionLocal(autoflush=True)
 
 with open("knowledge/templates.json") as f:
     data = json.load(f)
@@ -0,0 +1,91 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobManager:
+    """
+    Runs long jobs, like a crew run, on a bounded pool of worker threads.
+    Clients get a job id at once and poll the status, finished jobs are kept for JOB_RETENTION seconds.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, retention: float):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tvm-job")
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs = {}
+        self.lock = Lock()
+
+    def submit(self, owner_id: int, function: Callable, *args) -> dict:
+        """
+        Queue a job for the given user, raises JobQueueFullError when too many jobs are waiting or running
+        """
+        with self.lock:
+            self.remove_expired()
+            pending = sum(job["status"] in ("queued", "running") for job in self.jobs.values())
+            if pending >= self.max_pending:
+                raise JobQueueFullError()
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "owner_id": owner_id,
+                "status": "queued",
+                "result": None,
+                "error": None,
+                "finished_at": None
+            }
+            self.jobs[job["id"]] = job
+
+        self.executor.submit(self.run, job, function, *args)
+        return self.public(job)
+
+    def run(self, job: dict, function: Callable, *args):
+        job["status"] = "running"
+        try:
+            job["result"] = function(*args)
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        job["finished_at"] = time.monotonic()
+
+    def get(self, job_id: str, owner_id: int) -> Optional[dict]:
+        """
+        The status of a job, only for the user that submitted it
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["owner_id"] != owner_id:
+                return None
+            return self.public(job)
+
+    def remove_expired(self):
+        now = time.monotonic()
+        for job_id in [
+            job_id for job_id, job in self.jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.retention
+        ]:
+            del self.jobs[job_id]
+
+    @staticmethod
+    def public(job: dict) -> dict:
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "result": job["result"],
+            "error": job["error"]
+        }
+
+
+job_manager = JobManager(
+    max_workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("JOB_QUEUE_SIZE", 20)),
+    retention=float(os.environ.get("JOB_RETENTION", 3600))
+)
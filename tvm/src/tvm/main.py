@@ -1,15 +1,37 @@
 #!/usr/bin/env python
+import asyncio
+import json
+import os
 import sys
+import time
 import warnings
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+from crewai.crews.crew_output import CrewOutput
 from fastapi import FastAPI
-from db import get_db
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from db import get_db, SessionLocal, async_engine
 from filter import filter_service
 from filter_input_util import input_filter
 from starlette.middleware.cors import CORSMiddleware
-from crew import Tvm
+from crew import tvm_factory, RunCancelledError
+from response_cache import response_cache
+from catalog import template_catalog
+from semantic_cache import semantic_cache
+from relevance_classifier import relevance_classifier
+from jobs import job_manager, JobQueueFullError
+from progress import RunProgress
+from metrics import crew_metrics, pool_metrics
+from pagination import NEXT_CURSOR_HEADER
+from cassette import cassette, CassetteMissError
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+# Start the crew while the input is screened, instead of after it
+SPECULATIVE_SCREENING = os.environ.get("SPECULATIVE_SCREENING", "false").lower() == "true"
+
 tags_metadata = [
     {
         "name": "Authentication",
@@ -25,9 +47,19 @@ tags_metadata = [
     }
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the default crew once at startup instead of on every request
+    tvm_factory.get().warm_up()
+    yield
+    await async_engine.dispose()
+
+
 app = FastAPI(openapi_tags=tags_metadata,
               title="TVM AI",
-              version="0.0.1", )
+              version="0.0.1",
+              lifespan=lifespan)
 
 from authentication import *
 from chat import *
@@ -39,36 +71,84 @@ app.add_middleware(
     allow_methods=["*"],
     allow_credentials=True,
     allow_headers=["*"],
+    # Browsers only let clients read the headers that are exposed
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
-@app.post("/run", tags=["Chat"])
-def run(
-        data: InputData,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
+def generate_response(data: InputData, progress: Optional[RunProgress] = None) -> str:
     """
-    Send a message and run the crew.
+    Screens the input and runs the crew, unless the response is cached.
     """
-
+    start = time.perf_counter()
     filtered_input = input_filter.filter_input(data.input)
     inputs = {
         "input": filtered_input,
     }
 
-    # Check if the input is insurance related using the filter service
-    is_insurance_related = filter_service.screen_query(data.input)
+    # The same advisory text gives the same response, as long as the catalog has not changed
+    cache_key = response_cache.key(filtered_input, data.process, data.writing_mode)
+    ai_response = response_cache.get(cache_key)
+    source = "cache"
 
-    if not is_insurance_related:
-        ai_response = "Sorry, ik kan alleen helpen bij het omzetten van adviesteksten. Stuur alstublieft alleen een adviestekst die u wilt omzetten."
-    else:
-        try:
-            result = Tvm().crew().kickoff(inputs=inputs)
+    if ai_response is None:
+        if SPECULATIVE_SCREENING:
+            is_insurance_related, result = run_crew_while_screening(data, inputs, progress)
+        else:
+            # Check if the input is insurance related using the filter service
+            is_insurance_related = filter_service.screen_query(data.input)
+            result = run_crew(data, inputs, progress) if is_insurance_related else None
+
+        if not is_insurance_related:
+            ai_response = "Sorry, ik kan alleen helpen bij het omzetten van adviesteksten. Stuur alstublieft alleen een adviestekst die u wilt omzetten."
+            source = "filter"
+        else:
+            source = "crew"
             ai_response = result.raw
-        except Exception as e:
-            raise Exception(f"An error occurred while running the crew: {e}")
 
+        response_cache.set(cache_key, ai_response)
+
+    crew_metrics.run_seconds.observe(time.perf_counter() - start, source=source)
+    return ai_response
+
+
+def run_crew(data: InputData, inputs: dict, progress: Optional[RunProgress] = None,
+             screening: Optional[Future] = None) -> CrewOutput:
+    """
+    Runs the crew for the process and writing mode of the request.
+    """
+    try:
+        return tvm_factory.get(data.process, data.writing_mode).kickoff(inputs=inputs, progress=progress,
+                                                                        screening=screening)
+    except RunCancelledError:
+        raise
+    except Exception as e:
+        raise Exception(f"An error occurred while running the crew: {e}")
+
+
+def run_crew_while_screening(data: InputData, inputs: dict, progress: Optional[RunProgress] = None) -> tuple:
+    """
+    Starts the crew without waiting for the screening. The crew waits for the screening before it writes,
+    and stops when the input is rejected. Returns whether the input is insurance related and the crew result.
+    """
+    screening = filter_service.start_screening(data.input)
+    try:
+        result = run_crew(data, inputs, progress, screening)
+    except RunCancelledError:
+        return False, None
+    except Exception:
+        # A crew error is only reported for an input that passed the screening
+        if not screening.result():
+            return False, None
+        raise
+    return True, result
+
+
+def save_conversation(db: Session, data: InputData, user_id: int, ai_response: str) -> dict:
+    """
+    Saves the user message and the response in the given conversation, or in a new one.
+    Everything is written in one transaction, the ids come from the inserts instead of extra selects.
+    """
     conversation = None
     conversation_created = False
 
@@ -76,46 +156,229 @@ def run(
     if data.conversation_id:
         conversation = db.query(Conversation).filter(
             Conversation.id == data.conversation_id,
-            Conversation.user_id == current_user.id
+            Conversation.user_id == user_id
         ).first()
 
     # If no conversation was found, create a new one
     if not conversation:
         conversation = Conversation(
-            user_id=current_user.id,
+            user_id=user_id,
             created_at=datetime.now(timezone.utc)
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
         conversation_created = True
 
-    # Add the user message to the conversation
+    # Add the user message and the AI response to the conversation, flushed together with a new conversation
     user_message = Message(
-        conversation_id=conversation.id,
+        conversation=conversation,
         content=data.input,
         is_user_message=True,
         created_at=datetime.now(timezone.utc)
     )
-    db.add(user_message)
-
-    # Add the AI response to the conversation
     ai_message = Message(
-        conversation_id=conversation.id,
+        conversation=conversation,
         content=ai_response,
         is_user_message=False,
         created_at=datetime.now(timezone.utc)
     )
-    db.add(ai_message)
-
-    db.commit()
-    db.refresh(user_message)
-    db.refresh(ai_message)
+    db.add_all([user_message, ai_message])
+    db.flush()
 
-    return {
+    # Read before the commit, which expires the objects
+    result = {
         "output": ai_response,
         "conversation_id": conversation.id,
         "conversation_created": conversation_created,
         "user_message_id": user_message.id,
         "ai_message_id": ai_message.id
     }
+    db.commit()
+    return result
+
+
+def run_job(data: InputData, user_id: int, progress: Optional[RunProgress] = None) -> dict:
+    """
+    Generates the response and saves it with a session of its own, the request's session is closed by then.
+    """
+    ai_response = generate_response(data, progress)
+    db = SessionLocal()
+    try:
+        return save_conversation(db, data, user_id, ai_response)
+    finally:
+        db.close()
+
+
+@app.post("/run", tags=["Chat"])
+def run(
+        data: InputData,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Send a message and run the crew.
+    """
+    ai_response = generate_response(data)
+    return save_conversation(db, data, current_user.id, ai_response)
+
+
+@app.post("/run/jobs", status_code=202, tags=["Chat"])
+def submit_run_job(
+        data: InputData,
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Send a message and run the crew in the background. Returns a job id to poll for the result.
+    """
+    try:
+        return job_manager.submit(current_user.id, run_job, data, current_user.id)
+    except JobQueueFullError:
+        raise HTTPException(status_code=503, detail="Er staan te veel verzoeken in de wachtrij, probeer het later opnieuw.")
+
+
+@app.get("/run/jobs/{job_id}", tags=["Chat"])
+def read_run_job(
+        job_id: str,
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Get the status of a job and, when it is done, the same result as the run endpoint.
+    """
+    job = job_manager.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Taak niet gevonden.")
+    return job
+
+
+@app.post("/run/stream", tags=["Chat"])
+async def stream_run(
+        data: InputData,
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Send a message and run the crew, streaming the progress as server-sent events: the job id, every task that
+    starts and completes, the chosen categories, the text of the fill in task as it is written and the result.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    progress = RunProgress(lambda event: loop.call_soon_threadsafe(events.put_nowait, event))
+
+    def stream_job() -> dict:
+        try:
+            result = run_job(data, current_user.id, progress)
+        except Exception as e:
+            progress.emit("error", detail=str(e))
+            raise
+        progress.emit("result", **result)
+        return result
+
+    try:
+        job = job_manager.submit(current_user.id, stream_job)
+    except JobQueueFullError:
+        raise HTTPException(status_code=503, detail="Er staan te veel verzoeken in de wachtrij, probeer het later opnieuw.")
+
+    async def event_stream():
+        yield server_sent_event({"event": "job", "job_id": job["job_id"]})
+        while True:
+            event = await events.get()
+            yield server_sent_event(event)
+            if event["event"] in ("result", "error"):
+                break
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+def server_sent_event(event: dict) -> str:
+    data = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.get("/run/cache", tags=["Chat"])
+def read_response_cache_stats(
+        admin: User = Depends(get_current_admin_user)
+):
+    """
+    Get the hit and miss counters of the response cache.
+    """
+    return response_cache.stats()
+
+
+@app.get("/run/semantic-cache", tags=["Chat"])
+def read_semantic_cache_stats(
+        admin: User = Depends(get_current_admin_user)
+):
+    """
+    Get the hit and miss counters of the semantic cache for category decisions and research.
+    """
+    return semantic_cache.stats()
+
+
+@app.get("/run/catalog", tags=["Chat"])
+def read_catalog_stats(
+        admin: User = Depends(get_current_admin_user)
+):
+    """
+    Get the hit rate and version of the in-memory catalog of categories and advisory texts.
+    """
+    return template_catalog.stats()
+
+
+@app.get("/run/relevance", tags=["Chat"])
+def read_relevance_classifier_stats(
+        admin: User = Depends(get_current_admin_user)
+):
+    """
+    Get the number of queries the local relevance classifier screened itself and escalated to the LLM.
+    """
+    return relevance_classifier.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Chat"])
+def read_metrics(
+        admin: User = Depends(get_current_admin_user)
+):
+    """
+    Get the duration histograms of runs, tasks, tool calls and LLM calls, the token usage per agent and
+    the use of the database connection pool, in the Prometheus text format.
+    """
+    return PlainTextResponse(crew_metrics.render() + pool_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def replay():
+    """
+    Runs the screening and the crew for an advisory text file (the first argument, or the benchmark sample).
+    With LLM_CASSETTE=record the LLM answers are recorded, with LLM_CASSETTE=replay they are served from the
+    recordings and no LLM is called. No recordings are committed, an input has to be recorded before it is replayed.
+    """
+    input_file = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "benchmarks" / "sample_input.txt"
+    mode = cassette.mode()
+    if mode == "off":
+        sys.exit(f"Set LLM_CASSETTE=record to record the LLM answers for {input_file}, "
+                 f"and LLM_CASSETTE=replay to replay them.")
+    try:
+        print(generate_response(InputData(input=input_file.read_text(encoding="utf-8"))))
+    except Exception as e:
+        if mode == "replay" and is_cassette_miss(e):
+            sys.exit(f"Not every LLM answer for {input_file} is recorded in {cassette.directory()}. Record them first "
+                     f"with: LLM_CASSETTE=record uv run replay {input_file}")
+        raise
+
+
+def is_cassette_miss(error: Optional[BaseException]) -> bool:
+    """
+    Whether the error comes from a prompt without a recorded answer, run_crew wraps the errors of the crew
+    """
+    while error is not None:
+        if isinstance(error, CassetteMissError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def test():
+    """
+    Runs the unit tests, the arguments are passed on to pytest. The unit tests make no LLM calls, with
+    LLM_CASSETTE=replay a call that was not recorded fails instead of reaching the LLM.
+    """
+    import pytest
+
+    sys.exit(pytest.main(sys.argv[1:] or [str(Path(__file__).parent / "test")]))
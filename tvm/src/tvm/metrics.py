@@ -0,0 +1,259 @@
+import time
+from bisect import bisect_left
+from threading import Lock, get_ident
+from typing import Callable, Dict, Iterable, Tuple, Type
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from crewai.utilities.events import (
+    crewai_event_bus,
+    TaskStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    ToolUsageStartedEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageErrorEvent,
+    LLMCallStartedEvent,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+)
+
+# Seconds, from a quick tool call to a multi-minute crew run
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+# Seconds, from a connection that was ready in the pool to a checkout that waited until DB_POOL_TIMEOUT
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """
+    Prometheus histogram with a fixed set of label names
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            counts, total = self.series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[key] = (counts, total + value)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self.series.items()}
+        for key, (counts, total) in sorted(series.items()):
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels({**labels, 'le': bound})} {cumulative}"
+            yield f"{self.name}_sum{format_labels(labels)} {total}"
+            yield f"{self.name}_count{format_labels(labels)} {cumulative}"
+
+
+class Counter:
+    """
+    Prometheus counter with a fixed set of label names
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.series = {}
+        self.lock = Lock()
+
+    def inc(self, value: float = 1, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self.lock:
+            series = dict(self.series)
+        for key, value in sorted(series.items()):
+            yield f"{self.name}{format_labels(dict(zip(self.label_names, key)))} {value}"
+
+
+class Gauge:
+    """
+    Prometheus gauge with a fixed set of label names, the values are read from functions when rendered
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.functions = {}
+        self.lock = Lock()
+
+    def set_function(self, function: Callable[[], float], **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.functions[key] = function
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        with self.lock:
+            functions = dict(self.functions)
+        for key, function in sorted(functions.items()):
+            yield f"{self.name}{format_labels(dict(zip(self.label_names, key)))} {function()}"
+
+
+def format_labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    escaped = {
+        name: str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for name, value in labels.items()
+    }
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}"
+
+
+class CrewMetrics:
+    """
+    Collects the duration of every task, tool call and LLM call from the crewAI event bus,
+    together with the duration of the runs and the token usage per agent
+    """
+
+    def __init__(self):
+        self.run_seconds = Histogram("tvm_run_seconds", "Duration of a run request", ("source",))
+        self.kickoff_seconds = Histogram("tvm_kickoff_seconds", "Duration of a Tvm kickoff",
+                                         ("process", "writing_mode"))
+        self.task_seconds = Histogram("tvm_task_seconds", "Duration of a crew task", ("task", "status"))
+        self.tool_seconds = Histogram("tvm_tool_seconds", "Duration of a tool call", ("tool", "status"))
+        self.llm_seconds = Histogram("tvm_llm_call_seconds", "Duration of an LLM call", ("model", "status"))
+        self.agent_tokens = Counter("tvm_agent_tokens_total", "Tokens used per agent", ("agent", "type"))
+        self.agent_requests = Counter("tvm_agent_llm_requests_total", "Successful LLM requests per agent", ("agent",))
+        self.started = {}
+        self.lock = Lock()
+
+        crewai_event_bus.register_handler(TaskStartedEvent, self.on_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, self.on_task_finished)
+        crewai_event_bus.register_handler(TaskFailedEvent, self.on_task_finished)
+        crewai_event_bus.register_handler(ToolUsageStartedEvent, self.on_started)
+        crewai_event_bus.register_handler(ToolUsageFinishedEvent, self.on_tool_finished)
+        crewai_event_bus.register_handler(ToolUsageErrorEvent, self.on_tool_error)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, self.on_started)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, self.on_llm_finished)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, self.on_llm_finished)
+
+    def on_started(self, source, event):
+        # Every run has its own copies of the tasks and LLMs, the thread separates concurrent calls of one LLM
+        with self.lock:
+            self.started[(id(source), get_ident())] = time.perf_counter()
+
+    def elapsed(self, source) -> float:
+        with self.lock:
+            started = self.started.pop((id(source), get_ident()), None)
+        return time.perf_counter() - started if started is not None else None
+
+    def on_task_finished(self, source, event):
+        seconds = self.elapsed(source)
+        if seconds is not None:
+            status = "failed" if isinstance(event, TaskFailedEvent) else "completed"
+            self.task_seconds.observe(seconds, task=source.name or "unnamed", status=status)
+
+    def on_tool_finished(self, source, event: ToolUsageFinishedEvent):
+        # The event has its own times, the start is only kept for failed calls
+        self.elapsed(source)
+        seconds = (event.finished_at - event.started_at).total_seconds()
+        self.tool_seconds.observe(seconds, tool=event.tool_name, status="cached" if event.from_cache else "completed")
+
+    def on_tool_error(self, source, event: ToolUsageErrorEvent):
+        seconds = self.elapsed(source)
+        if seconds is not None:
+            self.tool_seconds.observe(seconds, tool=event.tool_name, status="failed")
+
+    def on_llm_finished(self, source, event):
+        seconds = self.elapsed(source)
+        if seconds is not None:
+            status = "failed" if isinstance(event, LLMCallFailedEvent) else "completed"
+            self.llm_seconds.observe(seconds, model=getattr(source, "model", "unknown"), status=status)
+
+    def record_agent_usage(self, agents: Iterable):
+        """
+        Adds the token usage of the agents of a finished kickoff, every agent must only be passed once
+        """
+        for crew_agent in agents:
+            usage = crew_agent._token_process.get_summary()
+            role = crew_agent.role.strip()
+            self.agent_tokens.inc(usage.prompt_tokens, agent=role, type="prompt")
+            self.agent_tokens.inc(usage.completion_tokens, agent=role, type="completion")
+            self.agent_requests.inc(usage.successful_requests, agent=role)
+
+    def render(self) -> str:
+        metrics = [self.run_seconds, self.kickoff_seconds, self.task_seconds, self.tool_seconds, self.llm_seconds,
+                   self.agent_tokens, self.agent_requests]
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+crew_metrics = CrewMetrics()
+
+
+class PoolMetrics:
+    """
+    Counts the connections opened by and checked out of the connection pools of the engines it watches,
+    how long the checkouts waited for a connection, and the connections in use and in overflow right now
+    """
+
+    def __init__(self):
+        self.connections_opened = Counter("tvm_db_connections_opened_total", "New database connections", ("pool",))
+        self.checkouts = Counter("tvm_db_checkouts_total", "Connections checked out of the pool", ("pool",))
+        self.checkout_timeouts = Counter("tvm_db_checkout_timeouts_total",
+                                         "Checkouts that gave up waiting for a connection", ("pool",))
+        self.checkout_seconds = Histogram("tvm_db_checkout_seconds", "Time a checkout waited for a connection",
+                                          ("pool",), buckets=CHECKOUT_BUCKETS)
+        self.in_use = Gauge("tvm_db_connections_in_use", "Connections checked out of the pool right now", ("pool",))
+        self.overflow = Gauge("tvm_db_connections_overflow", "Connections open above the pool size right now",
+                              ("pool",))
+        self.size = Gauge("tvm_db_pool_size", "Connections the pool keeps open", ("pool",))
+
+    def timed(self, pool_class: Type[QueuePool], name: str) -> Type[QueuePool]:
+        """
+        A subclass of the pool class that records the wait of every checkout, pass it as poolclass to the engine
+        """
+        metrics = self
+
+        class TimedPool(pool_class):
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except exc.TimeoutError:
+                    metrics.checkout_timeouts.inc(pool=name)
+                    raise
+                finally:
+                    metrics.checkout_seconds.observe(time.perf_counter() - start, pool=name)
+
+        TimedPool.__name__ = f"Timed{pool_class.__name__}"
+        return TimedPool
+
+    def watch(self, name: str, engine: Engine):
+        event.listen(engine, "connect", lambda connection, record: self.connections_opened.inc(pool=name))
+        event.listen(engine, "checkout", lambda connection, record, proxy: self.checkouts.inc(pool=name))
+        # Through the engine, dispose replaces its pool
+        self.in_use.set_function(lambda: engine.pool.checkedout(), pool=name)
+        if isinstance(engine.pool, QueuePool):
+            # The overflow starts below zero, at minus the pool size, until the pool has opened that many connections
+            self.overflow.set_function(lambda: max(engine.pool.overflow(), 0), pool=name)
+            self.size.set_function(lambda: engine.pool.size(), pool=name)
+
+    def render(self) -> str:
+        metrics = [self.connections_opened, self.checkouts, self.checkout_timeouts, self.checkout_seconds,
+                   self.in_use, self.overflow, self.size]
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+pool_metrics = PoolMetrics()
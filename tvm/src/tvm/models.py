@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
-from typing import Optional
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Index
+from typing import Optional, Literal
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel
 from sqlalchemy.orm import relationship
@@ -34,6 +34,9 @@ class AdvisoryText(Base):
     sub_category = Column(String(255))
     text = Column(Text)
 
+    # Serves the lookups of templates by (category, sub_category) pair
+    __table_args__ = (Index("ix_advisory_texts_category_sub_category", "category", "sub_category"),)
+
 
 class Category(Base):
     __tablename__ = "categories"
@@ -55,8 +58,10 @@ class SubCategory(Base):
 class Conversation(Base):
     __tablename__ = "conversations"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    # Backs the foreign key and the keyset pagination of the conversations of a user
+    __table_args__ = (Index("ix_conversations_user_id_created_at", "user_id", "created_at"),)
 
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
@@ -65,10 +70,12 @@ class Conversation(Base):
 class Message(Base):
     __tablename__ = "messages"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False, index=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
     content = Column(Text, nullable=False)
     is_user_message = Column(Boolean, nullable=False)  # True (1) if sent by user, False (0) if sent by AI
     created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    # Backs the foreign key and the keyset pagination of the messages of a conversation
+    __table_args__ = (Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),)
 
     conversation = relationship("Conversation", back_populates="messages")
 
@@ -76,6 +83,8 @@ class Message(Base):
 class InputData(BaseModel):
     input: str
     conversation_id: Optional[int] = None
+    process: Optional[Literal["hierarchical", "sequential"]] = None  # Overrides CREW_PROCESS for this request
+    writing_mode: Optional[Literal["combined", "per_category"]] = None  # Overrides WRITING_MODE for this request
 
 
 class RefreshTokenRequest(BaseModel):
@@ -0,0 +1,55 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Response header with the cursor of the next page, the body stays the list of items
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Opaque cursor of the last row of a page, the next page starts after this (created_at, id)
+    """
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    The (created_at, id) of a cursor, raises ValueError when the cursor was not made by encode_cursor
+    """
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(statement, created_at_column, id_column, cursor: Optional[str], descending: bool, limit: int):
+    """
+    Page of the statement in (created_at, id) order that starts after the cursor. One row more than the limit
+    is selected, so keyset_page can tell whether there is a next page.
+    The comparison is written out instead of a row value, so MySQL can use the (..., created_at) index for it.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if descending:
+            statement = statement.where(or_(created_at_column < created_at,
+                                            and_(created_at_column == created_at, id_column < row_id)))
+        else:
+            statement = statement.where(or_(created_at_column > created_at,
+                                            and_(created_at_column == created_at, id_column > row_id)))
+    order = (created_at_column.desc(), id_column.desc()) if descending else (created_at_column.asc(), id_column.asc())
+    return statement.order_by(*order).limit(limit + 1)
+
+
+def keyset_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """
+    The rows of the page and the cursor of the next page, None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.created_at, last.id)
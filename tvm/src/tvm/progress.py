@@ -0,0 +1,83 @@
+from threading import Lock
+from typing import Callable, Optional
+from crewai import Crew
+from crewai.utilities.events import crewai_event_bus, TaskStartedEvent, TaskCompletedEvent, LLMStreamChunkEvent
+
+STREAMED_TASK = "fill_in_template"
+
+
+class RunProgress:
+    """
+    The progress events of one run, every event is a dict with an 'event' key that is passed to publish
+    """
+
+    def __init__(self, publish: Callable[[dict], None]):
+        self.publish = publish
+
+    def emit(self, event: str, **data):
+        self.publish({"event": event, **data})
+
+
+class ProgressTracker:
+    """
+    Routes the task and LLM stream events of the crewAI event bus to the run they belong to.
+    Every run has its own tasks and a crew set of its own, so their tasks and LLMs identify the run.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.llms = {}
+        self.lock = Lock()
+        crewai_event_bus.register_handler(TaskStartedEvent, self.on_task_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, self.on_task_completed)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, self.on_stream_chunk)
+
+    def watch(self, crew: Crew, progress: RunProgress, category: Optional[str] = None, stream: bool = False):
+        """
+        Send the events of the crew to the progress of its run. With stream, the agents' LLMs stream their
+        answers and the chunks of the fill in task are sent as well.
+        """
+        watched = {"progress": progress, "category": category, "running": None}
+        with self.lock:
+            for crew_task in crew.tasks:
+                self.tasks[id(crew_task)] = watched
+            if stream:
+                for crew_agent in crew.agents:
+                    # Every agent of a crew set has its own copy of the LLM, so this doesn't affect other runs
+                    crew_agent.llm.stream = True
+                    self.llms[id(crew_agent.llm)] = watched
+
+    def unwatch(self, crew: Crew):
+        with self.lock:
+            for crew_task in crew.tasks:
+                self.tasks.pop(id(crew_task), None)
+            for crew_agent in crew.agents:
+                # The crew set is reused by later runs, which only stream when they are watched with stream
+                crew_agent.llm.stream = False
+                self.llms.pop(id(crew_agent.llm), None)
+
+    def on_task_started(self, source, event: TaskStartedEvent):
+        watched = self.tasks.get(id(source))
+        if watched:
+            watched["running"] = source.name
+            self.emit(watched, "task_started", task=source.name)
+
+    def on_task_completed(self, source, event: TaskCompletedEvent):
+        watched = self.tasks.get(id(source))
+        if watched:
+            watched["running"] = None
+            self.emit(watched, "task_completed", task=source.name, output=event.output.raw)
+
+    def on_stream_chunk(self, source, event: LLMStreamChunkEvent):
+        watched = self.llms.get(id(source))
+        if watched and watched["running"] == STREAMED_TASK and event.tool_call is None:
+            self.emit(watched, "chunk", task=STREAMED_TASK, text=event.chunk)
+
+    @staticmethod
+    def emit(watched: dict, event: str, **data):
+        if watched["category"]:
+            data["category"] = watched["category"]
+        watched["progress"].emit(event, **data)
+
+
+progress_tracker = ProgressTracker()
@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Callable, List, Optional
+import numpy as np
+import yaml
+from embeddings import embedding_model
+
+EXAMPLES_FILE = Path(__file__).parent / "config" / "relevance_examples.yaml"
+
+
+class RelevanceClassifier:
+    """
+    Decides locally whether a query is about insurance, by comparing its embedding with labelled example queries.
+    The score is the mean similarity to the k closest relevant examples minus that to the k closest irrelevant ones.
+    Scores within the margin of zero are uncertain, those queries are left to the LLM screener.
+    """
+
+    def __init__(self, relevant: List[str], irrelevant: List[str], encode: Callable[[List[str]], np.ndarray],
+                 k: int = 3, margin: float = 0.05):
+        self.relevant = relevant
+        self.irrelevant = irrelevant
+        self.encode = encode
+        self.k = k
+        self.margin = margin
+        self.examples = None
+        self.lock = Lock()
+        self.local = 0
+        self.escalated = 0
+
+    @staticmethod
+    def load_examples(path: Path = EXAMPLES_FILE) -> dict:
+        with open(path, encoding="utf-8") as file:
+            return yaml.safe_load(file)
+
+    def example_embeddings(self) -> tuple:
+        """
+        The embedded examples, embedded on first use so the model is only loaded when the classifier is used
+        """
+        with self.lock:
+            if self.examples is None:
+                self.examples = (self.encode(self.relevant), self.encode(self.irrelevant))
+            return self.examples
+
+    def score(self, query: str) -> float:
+        relevant, irrelevant = self.example_embeddings()
+        embedding = self.encode([query])[0]
+        return float(self.top_mean(relevant @ embedding) - self.top_mean(irrelevant @ embedding))
+
+    def top_mean(self, similarities: np.ndarray) -> float:
+        k = min(self.k, len(similarities))
+        return float(np.mean(np.partition(similarities, -k)[-k:]))
+
+    def classify(self, query: str) -> Optional[bool]:
+        """
+        True or False when the classifier is confident, None when the query has to be escalated to the LLM
+        """
+        score = self.score(query)
+        confident = abs(score) >= self.margin
+        with self.lock:
+            if confident:
+                self.local += 1
+            else:
+                self.escalated += 1
+        return score > 0 if confident else None
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "local": self.local,
+                "escalated": self.escalated,
+                "examples": len(self.relevant) + len(self.irrelevant),
+                "margin": self.margin
+            }
+
+
+examples = RelevanceClassifier.load_examples()
+relevance_classifier = RelevanceClassifier(
+    relevant=examples["relevant"],
+    irrelevant=examples["irrelevant"],
+    encode=embedding_model.encode,
+    k=int(os.environ.get("RELEVANCE_CLASSIFIER_K", 3)),
+    margin=float(os.environ.get("RELEVANCE_CLASSIFIER_MARGIN", 0.05))
+)
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+from catalog import template_catalog
+
+
+class ResponseCache:
+    """
+    LRU cache with a time to live for the responses of the run endpoint.
+    Keys include the catalog version, so a change to the advisory texts makes every older entry unreachable.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(filtered_input: str, *options: Optional[str]) -> str:
+        """
+        Hash of the normalized input, the options that change the output and the current catalog version
+        """
+        parts = [filtered_input, *(option or "" for option in options), str(template_catalog.current_version())]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, response: str):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic(), response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl
+            }
+
+
+response_cache = ResponseCache(
+    max_size=int(os.environ.get("RESPONSE_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 3600))
+)
@@ -0,0 +1,30 @@
+from copy import copy
+from typing import Any, List, Optional
+from pydantic import Field
+from crewai import Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.task_output import TaskOutput
+
+
+class RoutedTask(Task):
+    """
+    Task that runs on its own LLM instead of the LLM of the agent that executes it,
+    so cheap tasks can use a cheaper model than the agent's other tasks
+    """
+
+    llm: Optional[Any] = Field(default=None, description="LLM to execute this task with, the agent's LLM if None")
+
+    def _execute_core(self, agent: Optional[BaseAgent], context: Optional[str], tools: Optional[List[Any]]) -> TaskOutput:
+        # A hierarchical crew passes its manager as the agent, the work is still delegated to the task's own agent
+        routed_agent = self.agent or agent
+        if self.llm is None or routed_agent is None or routed_agent.llm.model == self.llm.model:
+            return super()._execute_core(agent, context, tools)
+
+        # The agent builds its executor with its LLM for every task, so swapping it only affects this task.
+        # A crew set is used by one run at a time, and an agent executes one task at a time.
+        agent_llm = routed_agent.llm
+        routed_agent.llm = copy(self.llm)
+        try:
+            return super()._execute_core(agent, context, tools)
+        finally:
+            routed_agent.llm = agent_llm
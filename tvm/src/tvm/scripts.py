@@ -0,0 +1,21 @@
+import os
+import sys
+
+
+def load_main():
+    """
+    Imports main like 'python main.py' would, the modules of the app import each other without the package name
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    import main
+    return main
+
+
+def replay():
+    load_main().replay()
+
+
+def test():
+    load_main().test()
@@ -0,0 +1,100 @@
+import os
+import re
+from threading import Lock
+from typing import Callable, List, Optional
+import numpy as np
+from catalog import template_catalog
+from embeddings import embedding_model
+
+
+class SemanticCache:
+    """
+    In-process vector index of recent inputs with their category decision and research output.
+    A new input reuses these when it is nearly identical to an earlier one and the catalog has not changed.
+    """
+
+    def __init__(self, max_size: int, threshold: float, encode: Callable[[List[str]], np.ndarray]):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.encode = encode
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reset()
+
+    def reset(self, catalog_version: Optional[int] = None):
+        self.matrix = None
+        self.entries = []
+        self.next_row = 0
+        self.catalog_version = catalog_version
+
+    @staticmethod
+    def numbers(text: str) -> List[str]:
+        """
+        The amounts, years and counts in a text. Similar texts with different numbers need their own research.
+        """
+        return re.findall(r'\d+(?:[.,]\d+)*', text)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+    def lookup(self, text: str, embedding: np.ndarray) -> Optional[dict]:
+        """
+        The entry of the most similar earlier input, when it is above the threshold and has the same numbers
+        """
+        # Reloads an expired catalog first, so a change made by another process also clears the cache
+        catalog_version = template_catalog.current_version()
+        with self.lock:
+            if self.catalog_version != catalog_version:
+                self.reset(catalog_version)
+            if self.matrix is None:
+                self.misses += 1
+                return None
+
+            similarities = self.matrix[:len(self.entries)] @ embedding
+            best = int(np.argmax(similarities))
+            entry = self.entries[best]
+            if similarities[best] < self.threshold or entry["numbers"] != self.numbers(text):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def add(self, text: str, embedding: np.ndarray, decision: str, research: str):
+        """
+        Store the outputs for an input, replacing the oldest entry when the index is full
+        """
+        if self.max_size <= 0:
+            return
+        catalog_version = template_catalog.current_version()
+        with self.lock:
+            if self.catalog_version != catalog_version:
+                self.reset(catalog_version)
+            if self.matrix is None:
+                self.matrix = np.zeros((self.max_size, embedding.shape[0]), dtype=np.float32)
+
+            entry = {"numbers": self.numbers(text), "decision": decision, "research": research}
+            row = self.next_row
+            self.matrix[row] = embedding
+            if row < len(self.entries):
+                self.entries[row] = entry
+            else:
+                self.entries.append(entry)
+            self.next_row = (row + 1) % self.max_size
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold
+            }
+
+
+semantic_cache = SemanticCache(
+    max_size=int(os.environ.get("SEMANTIC_CACHE_SIZE", 512)),
+    threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", 0.97)),
+    encode=embedding_model.encode
+)
@@ -0,0 +1,246 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+PLACEHOLDER_PATTERN = re.compile(r'\[([a-z_]+)\]')
+# A value with any of these is not a value, like "Niet vermeld in de input." or "onbekend (n.v.t.)"
+EMPTY_PATTERN = re.compile(r'\b(niet (vermeld|bekend|genoemd|opgegeven|van toepassing)|onbekend|n\.?v\.?t|geen|'
+                           r'unknown|null|none)\b', re.IGNORECASE)
+AFFIRMATIVE_PATTERN = re.compile(r'ja\b', re.IGNORECASE)
+NEGATIVE_PATTERN = re.compile(r'nee\b', re.IGNORECASE)
+FOLLOWS_ADVICE_TEXT = "mijn advies opvolgt."
+NOT_FOLLOWS_ADVICE_TEXT = ("niet mijn advies opvolgt, omdat u {reason}. Wij willen u erop wijzen dat het accepteren van dit "
+                           "risico mogelijke gevolgen kan hebben voor uw financiële reserves. In het ergste geval zou uw "
+                           "bedrijfscontinuïteit in gevaar kunnen komen. U bent zich hiervan bewust en accepteert deze risico's.")
+
+# Label of the lines that start the section of a category in the research output
+CATEGORY_LABEL = "categorie"
+# Labels in the research output and the placeholders they provide an amount for
+RESEARCH_LABELS = {
+    "eigen risico": ["eigen_risico"],
+    "verzekerd bedrag": ["basis_verzekerd_bedrag"],
+}
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    name: str
+
+
+@dataclass(frozen=True)
+class Choice:
+    options: Tuple[Tuple["Segment", ...], ...]
+
+
+Segment = Union[str, Placeholder, Choice]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    segments: Tuple[Segment, ...]
+
+    @property
+    def placeholders(self) -> List[str]:
+        return list(dict.fromkeys(_placeholders(self.segments)))
+
+
+def _placeholders(segments) -> List[str]:
+    names = []
+    for segment in segments:
+        if isinstance(segment, Placeholder):
+            names.append(segment.name)
+        elif isinstance(segment, Choice):
+            for option in segment.options:
+                names.extend(_placeholders(option))
+    return names
+
+
+class TemplateEngine:
+    """
+    Compiles advisory templates into placeholders ('[variable_name]') and choices ('(optie a/optie b)'),
+    so the placeholders that follow from the research can be filled in without the LLM
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile(text: str) -> CompiledTemplate:
+        """
+        Parse a template text once, the result is cached per text
+        """
+        segments, _ = TemplateEngine._parse(text, 0, stop_chars="")
+        return CompiledTemplate(segments=tuple(segments))
+
+    @staticmethod
+    def _parse(text: str, position: int, stop_chars: str) -> Tuple[List[Segment], int]:
+        segments = []
+        literal = ""
+
+        while position < len(text) and text[position] not in stop_chars:
+            char = text[position]
+            placeholder = PLACEHOLDER_PATTERN.match(text, position) if char == "[" else None
+
+            if placeholder:
+                segments.append(literal)
+                literal = ""
+                segments.append(Placeholder(placeholder.group(1)))
+                position = placeholder.end()
+            elif char == "(":
+                options, end = TemplateEngine._parse_group(text, position + 1)
+                if options is None:
+                    # No closing parenthesis, keep the rest as it is
+                    literal += char
+                    position += 1
+                elif len(options) == 1:
+                    # Parentheses without a choice are just text
+                    segments.append(literal + "(")
+                    segments.extend(options[0])
+                    literal = ")"
+                    position = end
+                else:
+                    segments.append(literal)
+                    literal = ""
+                    segments.append(Choice(options=tuple(tuple(option) for option in options)))
+                    position = end
+            else:
+                literal += char
+                position += 1
+
+        segments.append(literal)
+        return [segment for segment in segments if segment != ""], position
+
+    @staticmethod
+    def _parse_group(text: str, position: int) -> Tuple[Optional[List[List[Segment]]], int]:
+        options = []
+        while True:
+            option, position = TemplateEngine._parse(text, position, stop_chars="/)")
+            options.append(option)
+            if position >= len(text):
+                return None, position
+            if text[position] == ")":
+                return options, position + 1
+            position += 1
+
+    @staticmethod
+    def parse_lines(research: str) -> List[Tuple[str, str]]:
+        """
+        The (label, value) of every 'Label: waarde' line in the research output, the label in lower case
+        """
+        lines = []
+        for line in research.splitlines():
+            label, separator, value = line.partition(":")
+            if not separator:
+                continue
+            label = re.sub(r'[*#_\-]', ' ', label).strip().lower()
+            label = re.sub(r'\s+', ' ', label)
+            lines.append((label, value.strip().strip("*").strip()))
+        return lines
+
+    @staticmethod
+    def category_section(research: str, category: str) -> Dict[str, set]:
+        """
+        The values per label in the section of the category, the lines between its 'Categorie: <naam>' line and
+        the next one. Lines outside the section can be about another category and are not used.
+        """
+        wanted = normalize_category(category)
+        found = {}
+        in_section = False
+        for label, value in TemplateEngine.parse_lines(research):
+            if label == CATEGORY_LABEL:
+                in_section = normalize_category(value) == wanted
+            elif in_section:
+                found.setdefault(label, set()).add(value)
+        return found
+
+    @staticmethod
+    def extract_values(research: str, category: str) -> Dict[str, str]:
+        """
+        Collect placeholder values from the 'Label: waarde' lines in the section of the category.
+        Only amounts and a clear yes or no are used. A label that occurs with different values, or a value that says
+        it is unknown, is left to the LLM.
+        """
+        found = TemplateEngine.category_section(research, category)
+
+        values = {}
+        for label, names in RESEARCH_LABELS.items():
+            candidates = found.get(label, set())
+            if len(candidates) == 1:
+                value = next(iter(candidates)).rstrip(".")
+                if is_amount(value):
+                    for name in names:
+                        values[name] = value
+
+        follows_advice = found.get("advies wordt opgevolgd", set())
+        if len(follows_advice) == 1:
+            answer = next(iter(follows_advice))
+            reasons = found.get("reden dat advies niet wordt opgevolgd", set())
+            if AFFIRMATIVE_PATTERN.match(answer) and not EMPTY_PATTERN.search(answer):
+                values["volg_advies_op"] = values["volgt_advies_op"] = FOLLOWS_ADVICE_TEXT
+            elif NEGATIVE_PATTERN.match(answer) and len(reasons) == 1:
+                reason = next(iter(reasons)).rstrip(".")
+                if reason and not EMPTY_PATTERN.search(reason):
+                    text = NOT_FOLLOWS_ADVICE_TEXT.format(reason=reason[0].lower() + reason[1:])
+                    values["volg_advies_op"] = values["volgt_advies_op"] = text
+
+        return values
+
+    @staticmethod
+    def fill(compiled: CompiledTemplate, values: Dict[str, str]) -> Tuple[str, List[str]]:
+        """
+        Fill in every placeholder that has a value, also inside choices, every choice stays open for the writer.
+        Returns the text, in which open placeholders and choices keep their template syntax, and the open slots.
+        """
+        open_slots = []
+        text = TemplateEngine._render(compiled.segments, values, open_slots)
+        return text, list(dict.fromkeys(open_slots))
+
+    @staticmethod
+    def _render(segments, values: Dict[str, str], open_slots: List[str]) -> str:
+        rendered = ""
+        for segment in segments:
+            if isinstance(segment, str):
+                rendered += segment
+            elif isinstance(segment, Placeholder):
+                if segment.name in values:
+                    rendered += values[segment.name]
+                else:
+                    rendered += f"[{segment.name}]"
+                    open_slots.append(f"[{segment.name}]")
+            else:
+                # Choices are advice decisions, like whether to take a cover and at which deductible. An amount in
+                # the research does not decide them, so every choice is left to the writer with its placeholders
+                # filled in.
+                options = [TemplateEngine._render(option, values, []) for option in segment.options]
+                choice = "(" + "/".join(options) + ")"
+                rendered += choice
+                open_slots.append(choice)
+        return rendered
+
+    def prefill(self, templates: List[dict], research: str) -> List[dict]:
+        """
+        Fill in what follows from the research section of its category in every fetched template,
+        adding the slots that are still open
+        """
+        prefilled = []
+        for template in templates:
+            if template["text"] is None:
+                prefilled.append(template)
+                continue
+            values = self.extract_values(research, template["category"])
+            text, open_slots = self.fill(self.compile(template["text"]), values)
+            prefilled.append({**template, "text": text, "open_slots": open_slots})
+        return prefilled
+
+
+def normalize_category(name: str) -> str:
+    return re.sub(r'[\s_]+', ' ', name.strip().strip("*").strip()).lower()
+
+
+def is_amount(value: str) -> bool:
+    """
+    Whether the value is an amount that can be filled in, it must have a number and must not say it is unknown
+    """
+    return bool(re.search(r'\d', value)) and not EMPTY_PATTERN.search(value)
+
+
+template_engine = TemplateEngine()
@@ -0,0 +1,79 @@
+import json
+import re
+from typing import List
+from catalog import template_catalog, normalize_pair
+
+
+class TemplateFetcher:
+    """
+    Pipeline stage that retrieves the advisory templates chosen by the crew, without an agent in between
+    """
+
+    @staticmethod
+    def parse_selection(raw: str) -> List[dict]:
+        """
+        Parse the category/sub_category decision of the crew into a list of pairs.
+        Accepts a JSON list, a single JSON object or loose JSON objects in between other text.
+        Items without a text category are skipped, a sub_category that is not a text counts as null.
+        """
+        raw = re.sub(r'```(?:json)?', '', raw).strip()
+
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            data = []
+            for match in re.findall(r'\{[^{}]*\}', raw):
+                try:
+                    data.append(json.loads(match))
+                except json.JSONDecodeError:
+                    continue
+
+        if isinstance(data, dict):
+            data = [data]
+
+        selection = []
+        seen_categories = set()
+        for item in data:
+            if not isinstance(item, dict) or not isinstance(item.get("category"), str) or not item["category"].strip():
+                continue
+            # The catalog matches names regardless of case and surrounding spaces, so does the deduplication
+            category_key, _ = normalize_pair(item["category"], None)
+            if category_key in seen_categories:
+                continue
+            sub_category = item.get("sub_category")
+            if not isinstance(sub_category, str) or not sub_category or sub_category.lower() == "null":
+                sub_category = None
+            seen_categories.add(category_key)
+            selection.append({"category": item["category"], "sub_category": sub_category})
+
+        return selection
+
+    @staticmethod
+    def fetch(selection: List[dict]) -> List[dict]:
+        """
+        Retrieve the advisory text for every selected pair from the in-memory catalog, keeping the order of the
+        selection. Pairs without a sub_category or without a matching template get None as text.
+        """
+        pairs = [(item["category"], item["sub_category"]) for item in selection]
+        texts = template_catalog.texts(pairs)
+
+        return [
+            {
+                "category": item["category"],
+                "sub_category": item["sub_category"],
+                "text": text if item["sub_category"] else None
+            }
+            for item, text in zip(selection, texts)
+        ]
+
+    @staticmethod
+    def format_templates(templates: List[dict]) -> str:
+        """
+        Format the fetched templates for use in a task description
+        """
+        if not templates:
+            return "Er zijn geen templates gekozen."
+        return json.dumps(templates, indent=2, ensure_ascii=False)
+
+
+template_fetcher = TemplateFetcher()
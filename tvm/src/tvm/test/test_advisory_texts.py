@@ -1,4 +1,5 @@
 from .test_main import *
+from tvm.advisory_texts import template_catalog
 
 
 # Get all categories
@@ -332,6 +333,30 @@ def test_update_advisory_text_200():
     assert response.status_code == 200
 
 
+def test_read_advisory_text_after_update():
+    token = get_token_admin()
+    client.get("/advisorytexts/id=9")
+    updated_data = {"text": "Tijdens de inventarisatie maken we een andere tekst"}
+
+    response = client.put("/advisorytexts/id=9", json=updated_data, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+    response = client.get("/advisorytexts/id=9")
+    assert response.json()["text"] == "Tijdens de inventarisatie maken we een andere tekst"
+
+
+def test_read_advisory_texts_from_catalog(monkeypatch):
+    client.get("/advisorytexts/")
+
+    def load():
+        raise AssertionError("the catalog was loaded again")
+
+    monkeypatch.setattr(template_catalog, "load", load)
+    assert client.get("/categories/").status_code == 200
+    assert client.get("/subcategories/1").status_code == 200
+    assert client.get("/advisorytexts/subcategory/1").status_code == 200
+
+
 def test_update_advisory_text_404():
     updated_data = {
         "category_id": 3,
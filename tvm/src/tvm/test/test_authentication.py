@@ -1,22 +1,22 @@
-import asyncio
-
 from .test_main import *
 from tvm.authentication import get_current_user
-from tvm.db import get_db
+from tvm.db import AsyncSessionLocal, SessionLocal
+from tvm.models import Conversation, Message
 
 
 # Get_current_user
+async def current_user_of(token: str):
+    async with AsyncSessionLocal() as db:
+        return await get_current_user(token, db)
+
+
 def test_get_current_user_success():
     token = get_token_admin()
     user = client.get("/me", headers={"Authorization": f"Bearer {token}"})
 
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        current_user = asyncio.run(get_current_user(token, db))
-        assert current_user.username == user.json()["username"]
-    finally:
-        db_gen.close()
+    # On the event loop of the client, the pooled connections of the async engine belong to it
+    current_user = client.portal.call(current_user_of, token)
+    assert current_user.username == user.json()["username"]
 
 
 def test_get_current_user_invalid_token():
@@ -226,6 +226,23 @@ def test_delete_user_200():
     assert response.status_code == 200
 
 
+def test_delete_user_with_conversations_200():
+    token = get_token_admin()
+    response = client.delete("/users/2", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "message": "Gebruiker 'test_not_admin' succesvol verwijderd!"
+    }
+
+    db = SessionLocal()
+    try:
+        assert db.query(Conversation).filter(Conversation.user_id == 2).count() == 0
+        assert db.query(Message).filter(Message.conversation_id.in_([3, 4])).count() == 0
+        assert db.query(Message).count() == 4
+    finally:
+        db.close()
+
+
 def test_delete_user_400():
     token = get_token_admin()
     response = client.delete("/users/1", headers={"Authorization": f"Bearer {token}"})
@@ -0,0 +1,41 @@
+import pytest
+from crewai import LLM
+from tvm.cassette import CassetteLLM, CassetteMissError
+
+
+@pytest.fixture
+def cassette_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CASSETTE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_record_and_replay(cassette_dir, monkeypatch):
+    calls = []
+    monkeypatch.setattr(LLM, "call", lambda self, messages, *args: calls.append(messages) or "Final Answer: YES")
+    llm = CassetteLLM(model="openai/gpt-4.1-mini")
+
+    monkeypatch.setenv("LLM_CASSETTE", "record")
+    assert llm.call("Is dit een adviestekst?") == "Final Answer: YES"
+
+    monkeypatch.setenv("LLM_CASSETTE", "replay")
+    assert llm.call([{"role": "user", "content": "Is dit een adviestekst?"}]) == "Final Answer: YES"
+    assert len(calls) == 1
+    assert len(list(cassette_dir.glob("*.json"))) == 1
+
+
+def test_replay_without_recording(cassette_dir, monkeypatch):
+    monkeypatch.setenv("LLM_CASSETTE", "replay")
+    llm = CassetteLLM(model="openai/gpt-4.1-mini")
+
+    with pytest.raises(CassetteMissError):
+        llm.call("Is dit een adviestekst?")
+
+
+def test_prompt_for_other_model_is_not_replayed(cassette_dir, monkeypatch):
+    monkeypatch.setattr(LLM, "call", lambda self, messages, *args: "Final Answer: YES")
+    monkeypatch.setenv("LLM_CASSETTE", "record")
+    CassetteLLM(model="openai/gpt-4.1-mini").call("Is dit een adviestekst?")
+
+    monkeypatch.setenv("LLM_CASSETTE", "replay")
+    with pytest.raises(CassetteMissError):
+        CassetteLLM(model="openai/gpt-4.1").call("Is dit een adviestekst?")
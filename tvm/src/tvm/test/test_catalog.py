@@ -0,0 +1,67 @@
+from tvm.catalog import TemplateCatalog
+
+
+def make_catalog(ttl: float = 60) -> tuple:
+    loads = []
+    data = {
+        "categories": {"damage_to_third_parties": ["minrisk", "risk_in_euros"]},
+        "texts": {("damage_to_third_parties", "minrisk"): "Tijdens de inventarisatie"}
+    }
+
+    def load() -> dict:
+        loads.append(1)
+        return {"categories": dict(data["categories"]), "texts": dict(data["texts"])}
+
+    return TemplateCatalog(load=load, ttl=ttl), loads, data
+
+
+def test_loaded_once():
+    catalog, loads, _ = make_catalog()
+
+    assert catalog.categories() == {"damage_to_third_parties": ["minrisk", "risk_in_euros"]}
+    assert catalog.text("damage_to_third_parties", "minrisk") == "Tijdens de inventarisatie"
+    assert catalog.texts([("damage_to_third_parties", "minrisk"), ("damage_to_third_parties", "none")]) == [
+        "Tijdens de inventarisatie", None
+    ]
+    assert len(loads) == 1
+    assert catalog.stats()["hits"] == 2
+
+
+def test_reloaded_after_bump():
+    catalog, loads, data = make_catalog()
+    catalog.categories()
+
+    data["texts"][("damage_to_third_parties", "minrisk")] = "Nieuwe tekst"
+    catalog.bump()
+
+    assert catalog.text("damage_to_third_parties", "minrisk") == "Nieuwe tekst"
+    assert len(loads) == 2
+
+
+def test_expired_change_bumps_version():
+    catalog, loads, data = make_catalog(ttl=0)
+    catalog.categories()
+    version = catalog.version
+
+    catalog.categories()
+    assert catalog.version == version
+
+    data["categories"]["damage_by_standstill"] = ["minrisk"]
+    assert "damage_by_standstill" in catalog.categories()
+    assert catalog.version == version + 1
+
+
+def test_text_matches_regardless_of_case_and_spaces():
+    catalog, _, _ = make_catalog()
+
+    assert catalog.text("Damage_To_Third_Parties ", " MINRISK") == "Tijdens de inventarisatie"
+    assert catalog.texts([("DAMAGE_TO_THIRD_PARTIES", "minrisk ")]) == ["Tijdens de inventarisatie"]
+
+
+def test_current_version_reloads_expired_catalog():
+    catalog, _, data = make_catalog(ttl=-1)
+    version = catalog.current_version()
+
+    data["texts"][("damage_to_third_parties", "risk_in_euros")] = "Nieuwe tekst"
+
+    assert catalog.current_version() == version + 1
@@ -1,4 +1,6 @@
 from .test_main import *
+from datetime import datetime, timedelta
+from tvm.pagination import encode_cursor
 
 
 # Get messages by conversation
@@ -48,3 +50,76 @@ def test_delete_all_conversations_200():
     token = get_token_admin()
     response = client.delete("/conversations", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
+
+
+# Pages of conversations and messages
+def test_get_user_conversations_pages():
+    token = get_token_admin()
+    response = client.get("/conversations?limit=2", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert [conversation["id"] for conversation in response.json()] == [5, 2]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/conversations?limit=2&cursor={next_cursor}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert [conversation["id"] for conversation in response.json()] == [1]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_conversation_messages_pages():
+    token = get_token_admin()
+    response = client.get("/conversations/1/messages?limit=1", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert [message["content"] for message in response.json()] == ["First test message"]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/conversations/1/messages?limit=1&cursor={next_cursor}",
+                          headers={"Authorization": f"Bearer {token}"})
+    assert [message["content"] for message in response.json()] == ["AI response"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_user_conversations_empty_page_404():
+    token = get_token_admin()
+    response = client.get("/conversations?limit=1", headers={"Authorization": f"Bearer {token}"})
+    newest = response.json()[0]
+    cursor = encode_cursor(datetime.fromisoformat(newest["created_at"]) - timedelta(days=3650), 0)
+
+    response = client.get(f"/conversations?cursor={cursor}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+    assert response.json() == {
+        "detail": "Geen gesprekken gevonden!"
+    }
+
+
+def test_get_user_conversations_invalid_cursor_400():
+    token = get_token_admin()
+    response = client.get("/conversations?cursor=invalid", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "Ongeldige cursor"
+    }
+
+
+def test_delete_conversation_deletes_messages():
+    token = get_token_admin()
+    response = client.delete("/conversations/1", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+    response = client.get("/conversations/1/messages", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+
+def test_delete_conversation_of_other_user_404():
+    token = get_token_admin()
+    response = client.delete("/conversations/3", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+
+def test_delete_all_conversations_count():
+    token = get_token_admin()
+    response = client.delete("/conversations", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"message": "Alle 3 gesprekken succesvol verwijderd!"}
+
+    response = client.get("/conversations", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
@@ -1,4 +1,6 @@
+import json
 from tvm.tools.db_tool import CustomAdvisoryDatabaseTool
+from tvm.tools.db_multiple_text_tool import MultiAdvisoryDatabaseTool
 
 
 def test_get_advisory_text():
@@ -22,3 +24,22 @@ Volledig Casco:
     result = tool._run(category=category, sub_category=sub_category)
 
     assert result == expected_text
+
+
+def test_get_multiple_advisory_texts_in_requested_order():
+    tool = MultiAdvisoryDatabaseTool()
+    pairs = [
+        {"category": "damage_to_passengers", "sub_category": "minrisk"},
+        {"category": "damage_to_third_parties", "sub_category": "it's \"quoted\""},
+        {"category": "damage_to_third_parties", "sub_category": "minrisk"},
+        {"category": " Damage_to_Passengers", "sub_category": "MINRISK "}
+    ]
+
+    result = json.loads(tool._run(pairs=pairs))
+
+    assert [(item["category"], item["sub_category"]) for item in result["texts"]] == [
+        ("damage_to_passengers", "minrisk"),
+        ("damage_to_third_parties", "minrisk")
+    ]
+    assert result["texts"][1]["text"].startswith("Tijdens de inventarisatie hebben wij vastgesteld")
+    assert result["missing"] == [{"category": "damage_to_third_parties", "sub_category": "it's \"quoted\""}]
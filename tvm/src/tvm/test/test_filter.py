@@ -0,0 +1,25 @@
+from tvm.filter import filter_service
+
+
+def test_direct_screening(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(filter_service.direct_llm, "call", lambda messages: prompts.append(messages) or "YES")
+
+    assert filter_service.screen_directly("Eigen risico van 2.500 euro voor 12 trekkers")
+    assert prompts[0][-1] == {"role": "user", "content": "Eigen risico van 2.500 euro voor 12 trekkers"}
+    assert filter_service.direct_llm.max_tokens == 3
+
+
+def test_direct_screening_rejects(monkeypatch):
+    monkeypatch.setattr(filter_service.direct_llm, "call", lambda messages: "NO")
+
+    assert not filter_service.screen_directly("Een recept voor appeltaart")
+
+
+def test_direct_screening_accepts_when_llm_fails(monkeypatch):
+    def fail(messages):
+        raise ConnectionError("LLM niet bereikbaar")
+
+    monkeypatch.setattr(filter_service.direct_llm, "call", fail)
+
+    assert filter_service.screen_directly("Een recept voor appeltaart")
@@ -0,0 +1,54 @@
+import time
+import pytest
+from tvm.jobs import JobManager, JobQueueFullError
+
+
+def wait_for(manager: JobManager, job_id: str, owner_id: int) -> dict:
+    for _ in range(100):
+        job = manager.get(job_id, owner_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+
+def test_job_result():
+    manager = JobManager(max_workers=1, max_pending=5, retention=60)
+    job = manager.submit(1, lambda text: {"output": text}, "Antwoord")
+
+    assert wait_for(manager, job["job_id"], 1)["result"] == {"output": "Antwoord"}
+
+
+def test_failed_job():
+    def fail():
+        raise ValueError("Crew mislukt")
+
+    manager = JobManager(max_workers=1, max_pending=5, retention=60)
+    job = wait_for(manager, manager.submit(1, fail)["job_id"], 1)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Crew mislukt"
+
+
+def test_job_of_other_user_is_hidden():
+    manager = JobManager(max_workers=1, max_pending=5, retention=60)
+    job = manager.submit(1, lambda: None)
+
+    assert manager.get(job["job_id"], 2) is None
+
+
+def test_queue_is_bounded():
+    manager = JobManager(max_workers=1, max_pending=1, retention=60)
+    manager.submit(1, time.sleep, 0.2)
+
+    with pytest.raises(JobQueueFullError):
+        manager.submit(1, time.sleep, 0.2)
+
+
+def test_finished_jobs_expire():
+    manager = JobManager(max_workers=1, max_pending=5, retention=0)
+    job = wait_for(manager, manager.submit(1, lambda: None)["job_id"], 1)
+    time.sleep(0.01)
+    manager.submit(1, lambda: None)
+
+    assert manager.get(job["job_id"], 1) is None
@@ -6,6 +6,15 @@ from tvm.main import app
 
 client = TestClient(app)
 
+
+# Runs the lifespan around the tests of a module, so every request of a module runs on the same event loop.
+# The pooled connections of the async engine belong to the loop that opened them, the lifespan disposes them.
+@pytest.fixture(scope="module", autouse=True)
+def app_lifespan():
+    with client:
+        yield
+
+
 def get_token_admin() -> str:
     login = {
         "username": "test_user",
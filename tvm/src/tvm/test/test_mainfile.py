@@ -1,7 +1,157 @@
+from concurrent.futures import Future
+from crewai.crews.crew_output import CrewOutput
+from sqlalchemy import event
+from tvm.db import SessionLocal, engine
+from tvm.models import Message
+from tvm import main
+from tvm.main import InputData
 from .test_main import *
 
 
 def test_run_without_access_token():
     data = {"input": "Test input"}
     response = client.post("/run",json=data)
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+def test_response_cache_stats_as_non_admin():
+    token = get_token_not_admin()
+    response = client.get("/run/cache", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def test_response_cache_stats_as_admin():
+    token = get_token_admin()
+    response = client.get("/run/cache", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert {"hits", "misses", "size"} <= response.json().keys()
+
+
+def test_run_job_without_access_token():
+    data = {"input": "Test input"}
+    response = client.post("/run/jobs", json=data)
+    assert response.status_code == 401
+
+
+def test_read_unknown_run_job():
+    token = get_token_not_admin()
+    response = client.get("/run/jobs/does_not_exist", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+
+def test_stream_run_without_access_token():
+    data = {"input": "Test input"}
+    response = client.post("/run/stream", json=data)
+    assert response.status_code == 401
+
+
+def test_metrics_as_non_admin():
+    token = get_token_not_admin()
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def test_metrics_as_admin():
+    token = get_token_admin()
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert "# TYPE tvm_task_seconds histogram" in response.text
+
+
+def test_relevance_classifier_stats_as_admin():
+    token = get_token_admin()
+    response = client.get("/run/relevance", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert {"local", "escalated"} <= response.json().keys()
+
+
+class ScreenedCrew:
+    """
+    Stands in for the crew, it stops like the real crew when the screening rejects the input
+    """
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    def kickoff(self, inputs, progress=None, screening=None):
+        if not screening.result():
+            raise main.RunCancelledError()
+        if self.error:
+            raise self.error
+        return CrewOutput(raw="Advies")
+
+
+def screened(monkeypatch, is_insurance_related: bool, crew: ScreenedCrew):
+    screening = Future()
+    screening.set_result(is_insurance_related)
+    monkeypatch.setattr(main.filter_service, "start_screening", lambda query: screening)
+    monkeypatch.setattr(main.tvm_factory, "get", lambda process, writing_mode: crew)
+
+
+def test_speculative_run_of_accepted_input(monkeypatch):
+    screened(monkeypatch, True, ScreenedCrew())
+    is_insurance_related, result = main.run_crew_while_screening(InputData(input="Adviestekst"), {"input": "Adviestekst"})
+    assert is_insurance_related
+    assert result.raw == "Advies"
+
+
+def test_speculative_run_of_rejected_input(monkeypatch):
+    screened(monkeypatch, False, ScreenedCrew())
+    assert main.run_crew_while_screening(InputData(input="Appeltaart"), {"input": "Appeltaart"}) == (False, None)
+
+
+def test_speculative_run_crew_error_of_accepted_input(monkeypatch):
+    screened(monkeypatch, True, ScreenedCrew(ValueError("LLM niet bereikbaar")))
+    with pytest.raises(Exception):
+        main.run_crew_while_screening(InputData(input="Adviestekst"), {"input": "Adviestekst"})
+
+
+def test_catalog_stats_as_admin():
+    token = get_token_admin()
+    response = client.get("/run/catalog", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert {"hits", "misses", "version"} <= response.json().keys()
+
+
+def save_with_statements(data: InputData, user_id: int) -> tuple:
+    """
+    Saves a conversation and returns the result with the SQL statements it sent
+    """
+    statements = []
+    listener = lambda connection, cursor, statement, *args: statements.append(statement.split()[0].upper())
+    event.listen(engine, "before_cursor_execute", listener)
+    db = SessionLocal()
+    try:
+        return main.save_conversation(db, data, user_id, "Advies"), statements
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_save_conversation_in_new_conversation():
+    result, statements = save_with_statements(InputData(input="Adviestekst"), 1)
+    assert result["conversation_created"]
+    # The ids come from the inserts, MySQL needs an insert per row for that, other databases can batch the messages
+    assert set(statements) == {"INSERT"}
+
+    db = SessionLocal()
+    try:
+        messages = db.query(Message).filter(Message.conversation_id == result["conversation_id"]).order_by(Message.id).all()
+    finally:
+        db.close()
+    assert [(message.id, message.is_user_message) for message in messages] == [
+        (result["user_message_id"], True), (result["ai_message_id"], False)
+    ]
+
+
+def test_save_conversation_in_existing_conversation():
+    result, statements = save_with_statements(InputData(input="Adviestekst", conversation_id=1), 1)
+    assert result["conversation_id"] == 1
+    assert not result["conversation_created"]
+    assert statements[0] == "SELECT"
+    assert set(statements[1:]) == {"INSERT"}
+
+
+def test_save_conversation_of_other_user_creates_conversation():
+    result, _ = save_with_statements(InputData(input="Adviestekst", conversation_id=3), 1)
+    assert result["conversation_id"] != 3
+    assert result["conversation_created"]
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+from tvm.metrics import Histogram, Counter, CrewMetrics, PoolMetrics
+
+
+def test_histogram_render():
+    histogram = Histogram("tvm_test_seconds", "Test", ("task",), buckets=(1, 5))
+    histogram.observe(0.5, task="research")
+    histogram.observe(3, task="research")
+    histogram.observe(10, task="research")
+
+    assert list(histogram.render()) == [
+        "# HELP tvm_test_seconds Test",
+        "# TYPE tvm_test_seconds histogram",
+        'tvm_test_seconds_bucket{task="research",le="1"} 1',
+        'tvm_test_seconds_bucket{task="research",le="5"} 2',
+        'tvm_test_seconds_bucket{task="research",le="+Inf"} 3',
+        'tvm_test_seconds_sum{task="research"} 13.5',
+        'tvm_test_seconds_count{task="research"} 3',
+    ]
+
+
+def test_counter_escapes_labels():
+    counter = Counter("tvm_test_total", "Test", ("agent",))
+    counter.inc(2, agent='Senior "reader"\n')
+
+    assert list(counter.render())[-1] == 'tvm_test_total{agent="Senior \\"reader\\"\\n"} 2'
+
+
+def test_task_duration():
+    metrics = CrewMetrics()
+    task = SimpleNamespace(name="research")
+
+    metrics.on_started(task, None)
+    metrics.on_task_finished(task, SimpleNamespace())
+
+    assert 'tvm_task_seconds_count{task="research",status="completed"} 1' in metrics.render()
+
+
+def test_failed_tool_duration(monkeypatch):
+    metrics = CrewMetrics()
+    tool_usage = SimpleNamespace()
+    clock = iter([10.0, 12.5])
+    monkeypatch.setattr("tvm.metrics.time.perf_counter", lambda: next(clock))
+
+    metrics.on_started(tool_usage, None)
+    metrics.on_tool_error(tool_usage, SimpleNamespace(tool_name="Advisory Database Tool"))
+    # Without its start a failure is not timed
+    metrics.on_tool_error(tool_usage, SimpleNamespace(tool_name="Advisory Database Tool"))
+
+    rendered = metrics.render()
+    assert 'tvm_tool_seconds_sum{tool="Advisory Database Tool",status="failed"} 2.5' in rendered
+    assert 'tvm_tool_seconds_count{tool="Advisory Database Tool",status="failed"} 1' in rendered
+
+
+def test_agent_usage():
+    metrics = CrewMetrics()
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20, successful_requests=2)
+    # Two copies of the writer, like the per-category writing crews
+    writers = [
+        SimpleNamespace(role="Senior text filler\n", _token_process=SimpleNamespace(get_summary=lambda: usage))
+        for _ in range(2)
+    ]
+
+    metrics.record_agent_usage(writers)
+
+    rendered = metrics.render()
+    assert 'tvm_agent_tokens_total{agent="Senior text filler",type="prompt"} 200' in rendered
+    assert 'tvm_agent_llm_requests_total{agent="Senior text filler"} 4' in rendered
+
+
+def test_pool_metrics(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    metrics = PoolMetrics()
+    metrics.watch("test", engine)
+
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    with engine.connect():
+        rendered = metrics.render()
+
+    assert 'tvm_db_connections_opened_total{pool="test"} 1' in rendered
+    assert 'tvm_db_checkouts_total{pool="test"} 4' in rendered
+    assert 'tvm_db_connections_in_use{pool="test"} 1' in rendered
+
+
+def test_pool_checkout_wait_and_overflow(tmp_path):
+    metrics = PoolMetrics()
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=metrics.timed(QueuePool, "test"),
+                           pool_size=1, max_overflow=1, pool_timeout=0.05)
+    metrics.watch("test", engine)
+
+    with engine.connect(), engine.connect():
+        rendered = metrics.render()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    rendered_after = metrics.render()
+
+    assert 'tvm_db_connections_in_use{pool="test"} 2' in rendered
+    assert 'tvm_db_connections_overflow{pool="test"} 1' in rendered
+    assert 'tvm_db_pool_size{pool="test"} 1' in rendered
+    assert 'tvm_db_checkout_timeouts_total{pool="test"} 1' in rendered_after
+    assert 'tvm_db_checkout_seconds_count{pool="test"} 3' in rendered_after
+    assert 'tvm_db_connections_overflow{pool="test"} 0' in rendered_after
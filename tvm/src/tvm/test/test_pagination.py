@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+from tvm.pagination import after_cursor, decode_cursor, encode_cursor, keyset_page
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "bm90IGEgY3Vyc29y", "!!!"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_page():
+    rows = [SimpleNamespace(id=number, created_at=datetime(2025, 1, number)) for number in range(1, 4)]
+    assert keyset_page(rows, 3) == (rows, None)
+    page, cursor = keyset_page(rows, 2)
+    assert page == rows[:2]
+    assert decode_cursor(cursor) == (rows[1].created_at, 2)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_pages_cover_every_row_once(descending):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    with Session(engine) as session:
+        # Pairs of rows with the same created_at, the id must break the tie
+        session.add_all([Row(id=number, created_at=start + timedelta(minutes=number // 2)) for number in range(1, 12)])
+        session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            statement = after_cursor(select(Row), Row.created_at, Row.id, cursor, descending=descending, limit=3)
+            page, cursor = keyset_page(session.scalars(statement).all(), 3)
+            seen.extend(row.id for row in page)
+            if cursor is None:
+                break
+
+    assert seen == sorted(range(1, 12), reverse=descending)
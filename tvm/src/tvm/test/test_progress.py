@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from tvm.progress import ProgressTracker, RunProgress
+
+
+def watched_crew(tracker: ProgressTracker, events: list, category=None):
+    llm = SimpleNamespace(stream=False)
+    crew = SimpleNamespace(
+        tasks=[SimpleNamespace(name="research"), SimpleNamespace(name="fill_in_template")],
+        agents=[SimpleNamespace(llm=llm)]
+    )
+    tracker.watch(crew, RunProgress(events.append), category=category, stream=True)
+    return crew, llm
+
+
+def test_task_events():
+    tracker = ProgressTracker()
+    events = []
+    crew, _ = watched_crew(tracker, events)
+    research = crew.tasks[0]
+
+    tracker.on_task_started(research, None)
+    tracker.on_task_completed(research, SimpleNamespace(output=SimpleNamespace(raw="Onderzoek")))
+
+    assert events == [
+        {"event": "task_started", "task": "research"},
+        {"event": "task_completed", "task": "research", "output": "Onderzoek"}
+    ]
+
+
+def test_only_fill_in_chunks_are_streamed():
+    tracker = ProgressTracker()
+    events = []
+    crew, llm = watched_crew(tracker, events, category="damage_by_standstill")
+    research, fill_in = crew.tasks
+
+    tracker.on_task_started(research, None)
+    tracker.on_stream_chunk(llm, SimpleNamespace(chunk="Gedachte", tool_call=None))
+    tracker.on_task_started(fill_in, None)
+    tracker.on_stream_chunk(llm, SimpleNamespace(chunk="Advies", tool_call=None))
+
+    assert llm.stream is True
+    assert events[-1] == {"event": "chunk", "task": "fill_in_template", "text": "Advies", "category": "damage_by_standstill"}
+    assert [event["event"] for event in events] == ["task_started", "task_started", "chunk"]
+
+
+def test_unwatched_crew_is_ignored():
+    tracker = ProgressTracker()
+    events = []
+    crew, _ = watched_crew(tracker, events)
+    tracker.unwatch(crew)
+
+    tracker.on_task_started(crew.tasks[0], None)
+
+    assert events == []
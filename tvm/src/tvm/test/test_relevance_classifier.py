@@ -0,0 +1,54 @@
+import numpy as np
+from tvm.relevance_classifier import RelevanceClassifier
+
+WORDS = ["verzekering", "risico", "schade", "recept", "taart", "voetbal"]
+
+
+def encode(texts):
+    """
+    Bag of words embedding, so the tests don't need the sentence-transformers model
+    """
+    rows = np.array([[text.lower().count(word) for word in WORDS] for text in texts], dtype=np.float32) + 0.01
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def make_classifier(margin: float = 0.2) -> RelevanceClassifier:
+    return RelevanceClassifier(
+        relevant=["Welke verzekering dekt schade?", "Eigen risico van de verzekering", "Schade door stilstand"],
+        irrelevant=["Een recept voor taart", "Wie won het voetbal?", "Taart bakken met een recept"],
+        encode=encode,
+        k=2,
+        margin=margin
+    )
+
+
+def test_classify_relevant_and_irrelevant():
+    classifier = make_classifier()
+
+    assert classifier.classify("Hoeveel risico kan de klant dragen voor schade?") is True
+    assert classifier.classify("Geef me een recept voor appeltaart") is False
+    assert classifier.stats()["local"] == 2
+
+
+def test_uncertain_query_is_escalated():
+    classifier = make_classifier()
+
+    assert classifier.classify("Hoe laat is het?") is None
+    assert classifier.stats()["escalated"] == 1
+
+
+def test_examples_are_embedded_once():
+    calls = []
+    classifier = make_classifier()
+    classifier.encode = lambda texts: calls.append(texts) or encode(texts)
+
+    classifier.classify("Schade aan de verzekering")
+    classifier.classify("Een taart")
+
+    assert len(calls) == 4
+
+
+def test_examples_file_has_both_labels():
+    examples = RelevanceClassifier.load_examples()
+
+    assert examples["relevant"] and examples["irrelevant"]
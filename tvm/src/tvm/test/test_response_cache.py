@@ -0,0 +1,64 @@
+import pytest
+import time
+from tvm.response_cache import ResponseCache, template_catalog
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch) -> dict:
+    """
+    The catalog data as if it were in the database, changes are seen by the next load
+    """
+    data = {"categories": {"damage_to_third_parties": ["minrisk"]}, "texts": {}}
+    monkeypatch.setattr(template_catalog, "load", lambda: {key: dict(value) for key, value in data.items()})
+    return data
+
+
+def test_hit_and_miss():
+    cache = ResponseCache(max_size=2, ttl=60)
+    key = cache.key("Adviestekst", None, None)
+
+    assert cache.get(key) is None
+    cache.set(key, "Antwoord")
+
+    assert cache.get(key) == "Antwoord"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(max_size=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResponseCache(max_size=2, ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_key_changes_with_options_and_catalog_version():
+    key = ResponseCache.key("Adviestekst", "sequential", None)
+
+    assert key != ResponseCache.key("Adviestekst", "hierarchical", None)
+    template_catalog.bump()
+    assert key != ResponseCache.key("Adviestekst", "sequential", None)
+
+
+def test_key_changes_when_another_process_changes_the_catalog(catalog, monkeypatch):
+    # Every lookup finds the catalog expired, the change is only visible through a reload
+    monkeypatch.setattr(template_catalog, "ttl", -1)
+    key = ResponseCache.key("Adviestekst", None, None)
+
+    catalog["texts"][("damage_to_third_parties", "minrisk")] = "Tekst van een andere worker"
+
+    assert key != ResponseCache.key("Adviestekst", None, None)
@@ -0,0 +1,74 @@
+import pytest
+from crewai import Agent, LLM, Task
+from tvm.routed_task import RoutedTask
+
+
+@pytest.fixture
+def executed_models(monkeypatch):
+    models = []
+
+    def execute_core(self, agent, context, tools):
+        models.append(self.agent.llm.model)
+        if agent is not self.agent:
+            models.append(agent.llm.model)
+
+    monkeypatch.setattr(Task, "_execute_core", execute_core)
+    return models
+
+
+def make_agent(model: str) -> Agent:
+    return Agent(role="Lezer", goal="Lezen", backstory="Leest adviesteksten", llm=LLM(model=model))
+
+
+def make_task(agent: Agent, llm=None) -> RoutedTask:
+    return RoutedTask(description="Lees de tekst", expected_output="De gegevens", agent=agent, llm=llm)
+
+
+def test_task_runs_on_its_own_llm(executed_models):
+    agent = make_agent("openai/gpt-4.1")
+    reasoning_llm = agent.llm
+
+    make_task(agent, LLM(model="openai/gpt-4.1-mini"))._execute_core(agent, None, [])
+
+    assert executed_models == ["openai/gpt-4.1-mini"]
+    assert agent.llm is reasoning_llm
+
+
+def test_task_without_llm_keeps_agent_llm(executed_models):
+    agent = make_agent("openai/gpt-4.1")
+
+    make_task(agent)._execute_core(agent, None, [])
+
+    assert executed_models == ["openai/gpt-4.1"]
+
+
+def test_manager_keeps_its_llm(executed_models):
+    agent = make_agent("openai/gpt-4.1")
+    manager = make_agent("openai/gpt-4.1")
+
+    make_task(agent, LLM(model="openai/gpt-4.1-mini"))._execute_core(manager, None, [])
+
+    assert executed_models == ["openai/gpt-4.1-mini", "openai/gpt-4.1"]
+    assert agent.llm.model == "openai/gpt-4.1"
+
+
+def test_agent_llm_restored_after_failure(monkeypatch):
+    def fail(self, agent, context, tools):
+        raise RuntimeError("LLM niet bereikbaar")
+
+    monkeypatch.setattr(Task, "_execute_core", fail)
+    agent = make_agent("openai/gpt-4.1")
+    reasoning_llm = agent.llm
+
+    with pytest.raises(RuntimeError):
+        make_task(agent, LLM(model="openai/gpt-4.1-mini"))._execute_core(agent, None, [])
+    assert agent.llm is reasoning_llm
+
+
+def test_copy_keeps_llm():
+    task = make_task(make_agent("openai/gpt-4.1"), LLM(model="openai/gpt-4.1-mini"))
+
+    copied = task.copy(agents=[make_agent("openai/gpt-4.1")], task_mapping={})
+
+    assert isinstance(copied, RoutedTask)
+    assert copied.llm.model == "openai/gpt-4.1-mini"
@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+from tvm.semantic_cache import SemanticCache, template_catalog
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch) -> dict:
+    """
+    The catalog data as if it were in the database, changes are seen by the next load
+    """
+    data = {"categories": {"damage_to_third_parties": ["minrisk"]}, "texts": {}}
+    monkeypatch.setattr(template_catalog, "load", lambda: {key: dict(value) for key, value in data.items()})
+    return data
+
+
+def encode(texts):
+    """
+    Bag of words embedding, enough to tell similar and different texts apart
+    """
+    vocabulary = ["eigen", "risico", "aansprakelijkheid", "stilstand", "passagiers", "advies", "euro"]
+    rows = []
+    for text in texts:
+        words = text.lower().split()
+        row = np.array([words.count(word) for word in vocabulary], dtype=np.float32) + 0.01
+        rows.append(row / np.linalg.norm(row))
+    return np.array(rows)
+
+
+def cache_with(text: str, max_size: int = 4) -> SemanticCache:
+    cache = SemanticCache(max_size=max_size, threshold=0.95, encode=encode)
+    cache.add(text, cache.embed(text), "beslissing", "onderzoek")
+    return cache
+
+
+def test_similar_input_is_a_hit():
+    cache = cache_with("Advies over eigen risico van 500 euro")
+    text = "advies  over het eigen risico van 500 euro"
+
+    entry = cache.lookup(text, cache.embed(text))
+
+    assert entry["decision"] == "beslissing"
+    assert entry["research"] == "onderzoek"
+    assert cache.stats()["hits"] == 1
+
+
+def test_different_input_is_a_miss():
+    cache = cache_with("Advies over eigen risico van 500 euro")
+    text = "Advies over stilstand en passagiers"
+
+    assert cache.lookup(text, cache.embed(text)) is None
+
+
+def test_different_numbers_are_a_miss():
+    cache = cache_with("Advies over eigen risico van 500 euro")
+    text = "Advies over eigen risico van 2.500 euro"
+
+    assert cache.lookup(text, cache.embed(text)) is None
+
+
+def test_catalog_change_clears_the_cache():
+    cache = cache_with("Advies over eigen risico van 500 euro")
+    template_catalog.bump()
+    text = "Advies over eigen risico van 500 euro"
+
+    assert cache.lookup(text, cache.embed(text)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_oldest_entry_is_replaced():
+    cache = cache_with("Advies over eigen risico", max_size=1)
+    cache.add("Advies over stilstand", cache.embed("Advies over stilstand"), "stilstand", "onderzoek")
+
+    assert cache.lookup("Advies over eigen risico", cache.embed("Advies over eigen risico")) is None
+    assert cache.lookup("Advies over stilstand", cache.embed("Advies over stilstand"))["decision"] == "stilstand"
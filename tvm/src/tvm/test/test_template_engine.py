@@ -0,0 +1,132 @@
+from tvm.template_engine import TemplateEngine, Placeholder, Choice
+
+TEMPLATE = ("Voor het verzekerde bedrag, gebaseerd op [basis_verzekerd_bedrag] en het "
+            "(eigen risico van [eigen_risico]./standaard eigen risico.) Deze bedragen vindt u terug op de polis. "
+            "U geeft aan dat u [volg_advies_op]")
+
+RESEARCH = """Inventaris: 12 trekkers en 15 opleggers
+Categorie: damage_to_third_parties
+- **Eigen risico**: € 2.500 per gebeurtenis
+Verzekerd bedrag: € 150.000 per voertuig
+Advies wordt opgevolgd: Ja
+Reden dat advies niet wordt opgevolgd: n.v.t.
+**Categorie**: loss of personal items
+Eigen risico: € 250
+Verzekerd bedrag: Niet vermeld in de input.
+Advies wordt opgevolgd: Onbekend"""
+
+
+def test_compile():
+    compiled = TemplateEngine.compile("Advies (geen dekking/een dekking van [bedrag]) voor (de klant).")
+
+    assert compiled.segments == (
+        "Advies ",
+        Choice(options=(("geen dekking",), ("een dekking van ", Placeholder("bedrag")))),
+        " voor (",
+        "de klant",
+        ").",
+    )
+    assert compiled.placeholders == ["bedrag"]
+
+
+def test_compile_nested_choice():
+    compiled = TemplateEngine.compile("(geen dekking./een dekking met (eigen risico van [eigen_risico]./standaard.))")
+
+    assert compiled.placeholders == ["eigen_risico"]
+    assert isinstance(compiled.segments[0], Choice)
+    assert isinstance(compiled.segments[0].options[1][1], Choice)
+
+
+def test_extract_values():
+    values = TemplateEngine.extract_values(RESEARCH, "damage_to_third_parties")
+
+    assert values["eigen_risico"] == "€ 2.500 per gebeurtenis"
+    assert values["basis_verzekerd_bedrag"] == "€ 150.000 per voertuig"
+    assert values["volg_advies_op"] == "mijn advies opvolgt."
+
+
+def test_extract_values_per_category():
+    values = TemplateEngine.extract_values(RESEARCH, "loss_of_personal_items")
+
+    assert values == {"eigen_risico": "€ 250"}
+
+
+def test_extract_values_outside_section():
+    research = "Eigen risico: 2.500 euro per gebeurtenis (schade aan derden)\nAdvies wordt opgevolgd: Ja"
+
+    assert TemplateEngine.extract_values(research, "damage_to_third_parties") == {}
+
+
+def test_extract_values_not_an_amount():
+    research = ("Categorie: damage_by_standstill\nEigen risico: geen eigen risico van 500 euro\n"
+                "Verzekerd bedrag: dagwaarde\nAdvies wordt opgevolgd: Nee\nReden dat advies niet wordt opgevolgd: "
+                "Niet vermeld in de input.")
+
+    assert TemplateEngine.extract_values(research, "damage_by_standstill") == {}
+
+
+def test_extract_values_ambiguous():
+    values = TemplateEngine.extract_values("Categorie: damage_by_standstill\nEigen risico: € 500\nEigen risico: € 1.000",
+                                           "damage_by_standstill")
+
+    assert "eigen_risico" not in values
+
+
+def test_fill():
+    values = TemplateEngine.extract_values(RESEARCH, "damage_to_third_parties")
+    text, open_slots = TemplateEngine.fill(TemplateEngine.compile(TEMPLATE), values)
+
+    assert text == ("Voor het verzekerde bedrag, gebaseerd op € 150.000 per voertuig en het (eigen risico van "
+                    "€ 2.500 per gebeurtenis./standaard eigen risico.) Deze bedragen vindt u terug op de polis. "
+                    "U geeft aan dat u mijn advies opvolgt.")
+    assert open_slots == ["(eigen risico van € 2.500 per gebeurtenis./standaard eigen risico.)"]
+
+
+def test_prefill_per_category():
+    templates = [{"category": "loss_of_personal_items", "sub_category": "minrisk", "text": TEMPLATE},
+                 {"category": "damage_to_passengers", "sub_category": None, "text": None}]
+
+    prefilled = TemplateEngine().prefill(templates, RESEARCH)
+
+    assert prefilled[0]["text"].startswith("Voor het verzekerde bedrag, gebaseerd op [basis_verzekerd_bedrag] en het "
+                                           "(eigen risico van € 250./standaard eigen risico.)")
+    assert prefilled[0]["open_slots"] == ["[basis_verzekerd_bedrag]", "(eigen risico van € 250./standaard eigen risico.)",
+                                          "[volg_advies_op]"]
+    assert prefilled[1] == templates[1]
+
+
+def test_fill_keeps_open_slots():
+    text, open_slots = TemplateEngine.fill(TemplateEngine.compile(TEMPLATE), {"basis_verzekerd_bedrag": "dagwaarde"})
+
+    assert "(eigen risico van [eigen_risico]./standaard eigen risico.)" in text
+    assert open_slots == ["(eigen risico van [eigen_risico]./standaard eigen risico.)", "[volg_advies_op]"]
+
+
+def test_fill_does_not_choose_the_only_filled_option():
+    compiled = TemplateEngine.compile("Mijn advies is om (geen dekking af te sluiten/een dekking met een eigen risico "
+                                      "van [eigen_risico] af te sluiten).")
+
+    text, open_slots = TemplateEngine.fill(compiled, {"eigen_risico": "€ 500"})
+
+    assert text == ("Mijn advies is om (geen dekking af te sluiten/een dekking met een eigen risico van € 500 af te "
+                    "sluiten).")
+    assert open_slots == ["(geen dekking af te sluiten/een dekking met een eigen risico van € 500 af te sluiten)"]
+
+
+def test_fill_does_not_choose_between_filled_options():
+    compiled = TemplateEngine.compile("(een eigen risico van [eigen_risico]/een verzekerd bedrag van "
+                                      "[basis_verzekerd_bedrag])")
+
+    text, open_slots = TemplateEngine.fill(compiled, {"eigen_risico": "€ 500", "basis_verzekerd_bedrag": "€ 10.000"})
+
+    assert text == "(een eigen risico van € 500/een verzekerd bedrag van € 10.000)"
+    assert open_slots == [text]
+
+
+def test_fill_leaves_advice_choices_to_llm():
+    compiled = TemplateEngine.compile("(geen dekking./een dekking met (eigen risico van [eigen_risico]./standaard.))")
+
+    text, open_slots = TemplateEngine.fill(compiled, {"eigen_risico": "€ 500"})
+
+    assert text == "(geen dekking./een dekking met (eigen risico van € 500./standaard.))"
+    assert open_slots == [text]
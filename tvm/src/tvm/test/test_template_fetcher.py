@@ -0,0 +1,70 @@
+from .test_main import *
+from tvm.template_fetcher import TemplateFetcher
+
+
+def test_parse_selection_list():
+    raw = """```json
+    [
+        {"category": "damage_to_third_parties", "sub_category": "minrisk"},
+        {"category": "damage_by_standstill", "sub_category": null}
+    ]
+    ```"""
+
+    assert TemplateFetcher.parse_selection(raw) == [
+        {"category": "damage_to_third_parties", "sub_category": "minrisk"},
+        {"category": "damage_by_standstill", "sub_category": None}
+    ]
+
+
+def test_parse_selection_loose_objects():
+    raw = """Category 1:
+    {"category": "loss_of_personal_items", "sub_category": "risk_in_euros"}
+    Category 2:
+    {"category": "damage_to_passengers", "sub_category": "null"}"""
+
+    assert TemplateFetcher.parse_selection(raw) == [
+        {"category": "loss_of_personal_items", "sub_category": "risk_in_euros"},
+        {"category": "damage_to_passengers", "sub_category": None}
+    ]
+
+
+def test_parse_selection_invalid():
+    assert TemplateFetcher.parse_selection("Geen categorieën gevonden.") == []
+
+
+def test_parse_selection_skips_names_that_are_not_text():
+    raw = """[
+        {"category": ["damage_to_third_parties"], "sub_category": "minrisk"},
+        {"category": 3, "sub_category": "minrisk"},
+        {"category": "damage_by_standstill", "sub_category": ["minrisk"]}
+    ]"""
+
+    assert TemplateFetcher.parse_selection(raw) == [{"category": "damage_by_standstill", "sub_category": None}]
+
+
+def test_parse_selection_deduplicates_like_the_catalog():
+    raw = """[
+        {"category": "Damage_to_Passengers", "sub_category": "minrisk"},
+        {"category": "damage_to_passengers ", "sub_category": "risk_in_euros"}
+    ]"""
+
+    assert TemplateFetcher.parse_selection(raw) == [{"category": "Damage_to_Passengers", "sub_category": "minrisk"}]
+
+
+def test_fetch_keeps_selection_order():
+    selection = [
+        {"category": "damage_to_passengers", "sub_category": "minrisk"},
+        {"category": "damage_by_standstill", "sub_category": None},
+        {"category": "damage_to_third_parties", "sub_category": "does_not_exist"}
+    ]
+
+    templates = TemplateFetcher.fetch(selection)
+
+    assert [template["category"] for template in templates] == [
+        "damage_to_passengers",
+        "damage_by_standstill",
+        "damage_to_third_parties"
+    ]
+    assert templates[0]["text"].startswith("Tijdens de inventarisatie hebben wij vastgesteld")
+    assert templates[1]["text"] is None
+    assert templates[2]["text"] is None
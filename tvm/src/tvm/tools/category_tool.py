@@ -1,7 +1,6 @@
 from crewai.tools import BaseTool
-from sqlalchemy import create_engine, text
+from catalog import template_catalog
 import json
-import os
 
 
 class CategoryTool(BaseTool):
@@ -13,42 +12,11 @@ class CategoryTool(BaseTool):
 
     def _run(self) -> str:
         """
-        Retrieve all categories and their subcategories from the MySQL database
+        Retrieve all categories and their subcategories from the in-memory catalog of the database
         Only returns categories that have subcategories
         """
         try:
-            connection_string = os.getenv("SQL_CONNECTION")
-            if not connection_string:
-                return "Error: SQL_CONNECTION environment variable not found"
-
-            engine = create_engine(connection_string)
-
-            with engine.connect() as connection:
-                # Query to get categories with their subcategories
-                query = text("""
-                             SELECT c.name  as category_name,
-                                    sc.name as subcategory_name
-                             FROM categories c
-                                      INNER JOIN sub_categories sc ON c.id = sc.category_id
-                             ORDER BY c.name, sc.name
-                             """)
-
-                result = connection.execute(query)
-                rows = result.fetchall()
-
-                # Structure the data
-                categories_dict = {}
-                for row in rows:
-                    category_name = row.category_name
-                    subcategory_name = row.subcategory_name
-
-                    if category_name not in categories_dict:
-                        categories_dict[category_name] = []
-
-                    # Add subcategory
-                    categories_dict[category_name].append(subcategory_name)
-
-                return json.dumps(categories_dict, indent=2, ensure_ascii=False)
+            return json.dumps(template_catalog.categories(), indent=2, ensure_ascii=False)
 
         except Exception as e:
             return f"Error retrieving categories from MySQL: {str(e)}"
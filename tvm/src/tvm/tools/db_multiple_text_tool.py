@@ -1,6 +1,6 @@
 from crewai.tools import BaseTool
-from sqlalchemy import create_engine, text
-import os
+from catalog import template_catalog, normalize_pair
+import json
 from typing import Type, List
 from pydantic import BaseModel, Field
 
@@ -20,48 +20,37 @@ class MultiAdvisoryDatabaseTool(BaseTool):
     name: str = "Multi-Advisory Database Tool"
     description: str = (
         "Retrieves multiple advisory text templates from the advisory_texts table "
-        "based on a list of category and sub_category pairs."
+        "based on a list of category and sub_category pairs. Returns JSON with the texts in the requested order "
+        "and the pairs that have no text."
     )
     args_schema: Type[BaseModel] = MultiDatabaseQueryInput
 
     def _run(self, pairs: List[dict]) -> str:
         try:
-            connection_string = os.getenv("SQL_CONNECTION")
-            if not connection_string:
-                return "Error: SQL_CONNECTION environment variable not found"
-
             if not pairs:
                 return "No category/sub_category pairs provided."
 
-            engine = create_engine(connection_string)
-
-            # Build dynamic tuple list for SQL
-            values_clause = ", ".join([
-                f"('{p['category']}', '{p['sub_category']}')" for p in pairs
-            ])
-
-            sql = f"""
-                SELECT category, text
-                FROM advisory_texts
-                WHERE (category, sub_category) IN ({values_clause})
-            """
-
-            with engine.connect() as connection:
-                result = connection.execute(text(sql))
-                rows = result.fetchall()
-
-                if not rows:
-                    return "No matching advisory texts found."
-
-                output = [
-                    {
-                        "category": row.category,
-                        "text": row.text
-                    }
-                    for row in rows
+            # Keep the requested order and ask for every pair once, the names match like in the catalog
+            requested = {}
+            for pair in map(AdvisoryPair.model_validate, pairs):
+                requested.setdefault(normalize_pair(pair.category, pair.sub_category),
+                                     (pair.category, pair.sub_category))
+            requested = list(requested.values())
+
+            # The pairs are looked up in a single snapshot of the catalog, nothing is formatted into SQL
+            texts = template_catalog.texts(requested)
+
+            output = {
+                "texts": [
+                    {"category": category, "sub_category": sub_category, "text": text}
+                    for (category, sub_category), text in zip(requested, texts) if text is not None
+                ],
+                "missing": [
+                    {"category": category, "sub_category": sub_category}
+                    for (category, sub_category), text in zip(requested, texts) if text is None
                 ]
-
-                return str(output)  # You could also return JSON
+            }
+            return json.dumps(output, ensure_ascii=False, separators=(",", ":"))
 
         except Exception as e:
             return f"Error retrieving advisory texts: {str(e)}"
@@ -1,6 +1,5 @@
 from crewai.tools import BaseTool
-from sqlalchemy import create_engine, text
-import os
+from catalog import template_catalog
 from typing import Type
 from pydantic import BaseModel, Field
 
@@ -26,30 +25,12 @@ class CustomAdvisoryDatabaseTool(BaseTool):
         Execute database query to retrieve advisory text.
         """
         try:
-            connection_string = os.getenv("SQL_CONNECTION")
-            if not connection_string:
-                return "Error: SQL_CONNECTION environment variable not found"
-
-            engine = create_engine(connection_string)
-
-            with engine.connect() as connection:
-                query = text("""
-                             SELECT text
-                             FROM advisory_texts
-                             WHERE category = :category
-                               AND sub_category = :sub_category LIMIT 1
-                             """)
-
-                result = connection.execute(query, {
-                    "category": category,
-                    "sub_category": sub_category
-                })
-                row = result.fetchone()
-
-                if row:
-                    return row.text
-                else:
-                    return f"No advisory text found for category: '{category}', sub_category: '{sub_category}'"
+            text = template_catalog.text(category, sub_category)
+
+            if text is not None:
+                return text
+            else:
+                return f"No advisory text found for category: '{category}', sub_category: '{sub_category}'"
 
         except Exception as e:
             return f"Error retrieving advisory text: {str(e)}"